@@ -0,0 +1,125 @@
+"""
+Runs the benchmark suites and writes the results as JSON.
+
+    python -m benchmarks                       all suites to stdout
+    python -m benchmarks --quick ff poly       selected suites, small sizes
+    python -m benchmarks -o run.json --compare baseline.json
+
+With --compare every timing is matched against the baseline run by its
+parameters, timings slower than the baseline by more than the tolerance are
+reported and the exit status is 1.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from benchmarks import ff_bench, poly_bench, merkle_bench, fri_bench, rescue_bench
+
+SUITES = {
+    "ff": (ff_bench.run, {}, {"size": 512, "repeat": 5}),
+    "poly": (poly_bench.run, {}, {"degrees": (16, 64), "repeat": 3}),
+    "merkle": (merkle_bench.run, {}, {"sizes": (256, 1024), "repeat": 3}),
+    "fri": (
+        fri_bench.run,
+        {},
+        {
+            "degree": 63,
+            "expansion_factors": (4, 8),
+            "num_colinearity_tests": (8, 16),
+            "repeat": 1,
+        },
+    ),
+    "rescue": (rescue_bench.run, {}, {"num_hashes": 8, "repeat": 3}),
+}
+
+
+def is_metric(key):
+    return (
+        key.endswith("seconds")
+        or key.endswith("_ns")
+        or key.endswith("per_second")
+        or key in ("speedup", "proof_bytes")
+    )
+
+
+def key_of(result):
+    return tuple(sorted((k, v) for k, v in result.items() if not is_metric(k)))
+
+
+def compare(baseline, current, tolerance):
+    """
+    Returns the regressions of current against baseline as
+    (suite, parameters, metric, baseline, current) tuples.
+    """
+    regressions = []
+    for suite, results in current["results"].items():
+        reference = {key_of(r): r for r in baseline["results"].get(suite, [])}
+        for result in results:
+            base = reference.get(key_of(result))
+            if base is None:
+                continue
+            for metric, value in result.items():
+                if not is_metric(metric) or metric not in base or metric == "speedup":
+                    continue
+                if metric.endswith("per_second"):
+                    slower = value * tolerance < base[metric]
+                else:
+                    slower = value > base[metric] * tolerance
+                if slower:
+                    regressions += [
+                        (suite, dict(key_of(result)), metric, base[metric], value)
+                    ]
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("suites", nargs="*", help=f"any of {', '.join(SUITES)}")
+    parser.add_argument(
+        "--quick", action="store_true", help="small sizes, for smoke runs"
+    )
+    parser.add_argument("-o", "--output", help="write the JSON results to this file")
+    parser.add_argument("--compare", help="baseline JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.25)
+    args = parser.parse_args(argv)
+    for suite in args.suites:
+        if suite not in SUITES:
+            parser.error(f"unknown suite {suite}")
+
+    run = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "timestamp": time.time(),
+        "quick": args.quick,
+        "results": {},
+    }
+    for suite in args.suites or list(SUITES):
+        fn, full, quick = SUITES[suite]
+        run["results"][suite] = fn(**(quick if args.quick else full))
+
+    output = json.dumps(run, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, run, args.tolerance)
+        for suite, parameters, metric, before, after in regressions:
+            print(
+                f"regression in {suite} {parameters} {metric}: "
+                f"{before:.3g} -> {after:.3g}",
+                file=sys.stderr,
+            )
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Microbenchmark of scalar field operations.
+
+Compares FieldElement against the previous implementation, kept below as
+LegacyFieldElement, which dispatched every operation through FiniteField,
+carried a per-instance __dict__ and exponentiated by square-and-multiply.
+
+    python -m benchmarks.ff_bench
+"""
+
+import operator
+import random
+from superstark.constants import STARK_FIELD
+from superstark.fastmath import xgcd
+from superstark.ff import FieldElement, FiniteField
+from benchmarks.timing import best
+
+
+class LegacyFieldElement:
+    def __init__(self, value, field):
+        self.value = value
+        self.field = field
+
+    def __add__(self, right):
+        return self.field.add(self, right)
+
+    def __mul__(self, right):
+        return self.field.mul(self, right)
+
+    def __sub__(self, right):
+        return self.field.sub(self, right)
+
+    def inv(self):
+        return self.field.inv(self)
+
+    def __xor__(self, exponent):
+        acc = LegacyFieldElement(1, self.field)
+        val = LegacyFieldElement(self.value, self.field)
+        for i in reversed(range(len(bin(exponent)[2:]))):
+            acc = acc * acc
+            if (1 << i) & exponent != 0:
+                acc = acc * val
+        return acc
+
+
+class LegacyFiniteField:
+    def __init__(self, p):
+        self.p = p
+
+    def mul(self, l, r):
+        return LegacyFieldElement((l.value * r.value) % self.p, self)
+
+    def add(self, l, r):
+        return LegacyFieldElement((l.value + r.value) % self.p, self)
+
+    def sub(self, l, r):
+        return LegacyFieldElement((self.p + l.value - r.value) % self.p, self)
+
+    def inv(self, operand):
+        a, b, g = xgcd(operand.value, self.p)
+        return LegacyFieldElement(((a % self.p) + self.p) % self.p, self)
+
+
+OPERATIONS = {
+    "add": lambda xs, ys: list(map(operator.add, xs, ys)),
+    "sub": lambda xs, ys: list(map(operator.sub, xs, ys)),
+    "mul": lambda xs, ys: list(map(operator.mul, xs, ys)),
+    "inv": lambda xs, ys: [x.inv() for x in xs],
+    "exp": lambda xs, ys: [x ^ 65537 for x in xs],
+}
+
+
+def measure(make, field, operation, size, repeat):
+    xs = [make(random.randrange(1, field.p), field) for i in range(size)]
+    ys = [make(random.randrange(1, field.p), field) for i in range(size)]
+    op = OPERATIONS[operation]
+    return best(lambda: op(xs, ys), repeat) / size * 1e9
+
+
+def run(p=STARK_FIELD, size=4096, repeat=25):
+    results = []
+    for operation in OPERATIONS:
+        legacy = measure(
+            LegacyFieldElement, LegacyFiniteField(p), operation, size, repeat
+        )
+        current = measure(FieldElement, FiniteField(p), operation, size, repeat)
+        results += [
+            {
+                "operation": operation,
+                "legacy_ns": legacy,
+                "current_ns": current,
+                "speedup": legacy / current,
+            }
+        ]
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'op':<6}{'legacy ns':>12}{'current ns':>12}{'speedup':>10}")
+    for r in run():
+        print(
+            f"{r['operation']:<6}{r['legacy_ns']:>12.0f}"
+            f"{r['current_ns']:>12.0f}{r['speedup']:>9.1f}x"
+        )
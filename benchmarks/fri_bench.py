@@ -0,0 +1,64 @@
+"""
+FRI prove and verify across expansion factors and colinearity tests.
+
+The prover time is split into the commit phase, measured on its own, and the
+query phase which is the rest of prove. Proof sizes are the length of the
+serialized proof stream.
+
+    python -m benchmarks.fri_bench
+"""
+
+import json
+from superstark.constants import STARK_FIELD
+from superstark.ff import FieldElement, FiniteField
+from superstark.fri import FRI
+from superstark.fs import ProofStream
+from superstark.poly import Univariate
+from superstark.ntt import fast_coset_evaluate
+from benchmarks.timing import best
+
+
+def run(
+    p=STARK_FIELD,
+    degree=255,
+    expansion_factors=(4, 8, 16),
+    num_colinearity_tests=(8, 16, 32),
+    repeat=3,
+):
+    field = FiniteField(p)
+    polynomial = Univariate([FieldElement(i, field) for i in range(degree + 1)])
+    results = []
+    for expansion_factor in expansion_factors:
+        length = (degree + 1) * expansion_factor
+        omega = field.primitive_nth_root(length)
+        offset = field.generator()
+        codeword = fast_coset_evaluate(polynomial, offset, omega, length)
+        for num_tests in num_colinearity_tests:
+            fri = FRI(offset, omega, length, expansion_factor, num_tests)
+
+            commit = best(lambda: fri.commit_trees(codeword, ProofStream()), repeat)
+            prove = best(lambda: fri.prove(codeword, ProofStream()), repeat)
+            proof_stream = ProofStream()
+            fri.prove(codeword, proof_stream)
+            proof = proof_stream.serialize()
+
+            def verify():
+                assert fri.verify(ProofStream().deserialize(proof), [])
+
+            results += [
+                {
+                    "expansion_factor": expansion_factor,
+                    "num_colinearity_tests": num_tests,
+                    "num_rounds": fri.num_rounds(),
+                    "commit_seconds": commit,
+                    "query_seconds": max(prove - commit, 0.0),
+                    "prove_seconds": prove,
+                    "verify_seconds": best(verify, repeat),
+                    "proof_bytes": len(proof),
+                }
+            ]
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,46 @@
+"""
+Merkle commitments across sizes.
+
+Times committing to a codeword, opening by rehashing the list as
+Merkle.open does, opening from a precomputed MerkleTree and verifying.
+
+    python -m benchmarks.merkle_bench
+"""
+
+import json
+import random
+from superstark.constants import STARK_FIELD
+from superstark.ff import FieldElement, FiniteField
+from superstark.merkle import Merkle, MerkleTree
+from benchmarks.timing import best
+
+
+def run(p=STARK_FIELD, sizes=(256, 1024, 4096), repeat=5, num_openings=16):
+    field = FiniteField(p)
+    results = []
+    for size in sizes:
+        leafs = [FieldElement(random.randrange(p), field) for i in range(size)]
+        indices = [random.randrange(size) for i in range(num_openings)]
+        tree = MerkleTree(leafs)
+        root = tree.root()
+        paths = [tree.open(i) for i in indices]
+
+        operations = {
+            "commit": lambda: Merkle.commit(leafs),
+            "open": lambda: [Merkle.open(i, leafs) for i in indices],
+            "tree_open": lambda: [tree.open(i) for i in indices],
+            "verify": lambda: [
+                Merkle.verify(root, i, path, leafs[i])
+                for i, path in zip(indices, paths)
+            ],
+        }
+        for operation, fn in operations.items():
+            seconds = best(fn, repeat)
+            if operation != "commit":
+                seconds /= num_openings
+            results += [{"operation": operation, "size": size, "seconds": seconds}]
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,76 @@
+"""
+Polynomial arithmetic across degrees.
+
+Times schoolbook, NTT and packed multiplication, long division, evaluation
+on a domain and interpolation by Lagrange and by inverse NTT. Lagrange
+interpolation is cubic and only timed up to LAGRANGE_MAX_DEGREE.
+
+    python -m benchmarks.poly_bench
+"""
+
+import json
+import random
+from superstark.constants import STARK_FIELD
+from superstark.ff import FieldElement, FiniteField
+from superstark.poly import Univariate
+from superstark.packed import PackedUnivariate
+from superstark.ntt import fast_multiply, intt
+from benchmarks.timing import best
+
+LAGRANGE_MAX_DEGREE = 64
+
+
+def random_polynomial(field, degree):
+    return Univariate(
+        [FieldElement(random.randrange(field.p), field) for i in range(degree + 1)]
+    )
+
+
+def run(p=STARK_FIELD, degrees=(16, 64, 256), repeat=5):
+    field = FiniteField(p)
+    results = []
+    for degree in degrees:
+        lhs = random_polynomial(field, degree)
+        rhs = random_polynomial(field, degree)
+        divisor = random_polynomial(field, degree // 2)
+        packed_lhs = PackedUnivariate.from_univariate(lhs)
+        packed_rhs = PackedUnivariate.from_univariate(rhs)
+
+        order = 1
+        while order <= 2 * degree + 1:
+            order <<= 1
+        root = field.primitive_nth_root(order)
+        size = 1
+        while size <= degree:
+            size <<= 1
+        subgroup_root = field.primitive_nth_root(size)
+        domain = [subgroup_root ^ i for i in range(size)]
+        values = lhs.evaluate_domain(domain[: degree + 1])
+        subgroup_values = lhs.evaluate_domain(domain)
+
+        operations = {
+            "mul": lambda: lhs * rhs,
+            "fast_mul": lambda: fast_multiply(lhs, rhs, root, order),
+            "packed_mul": lambda: packed_lhs * packed_rhs,
+            "divide": lambda: Univariate.divide(lhs, divisor),
+            "evaluate": lambda: lhs.evaluate_domain(domain),
+            "interpolate": lambda: Univariate.interpolate_domain(
+                domain[: degree + 1], values
+            ),
+            "intt_interpolate": lambda: intt(subgroup_root, subgroup_values),
+        }
+        if degree > LAGRANGE_MAX_DEGREE:
+            del operations["interpolate"]
+        for operation, fn in operations.items():
+            results += [
+                {
+                    "operation": operation,
+                    "degree": degree,
+                    "seconds": best(fn, repeat),
+                }
+            ]
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
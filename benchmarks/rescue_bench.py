@@ -0,0 +1,28 @@
+"""
+RescuePrime hashing and trace generation throughput.
+
+    python -m benchmarks.rescue_bench
+"""
+
+import json
+from superstark.ff import FieldElement
+from superstark.rescue import RescuePrime
+from benchmarks.timing import best
+
+
+def run(num_hashes=64, repeat=5):
+    rp = RescuePrime()
+    inputs = [FieldElement(i + 1, rp.field) for i in range(num_hashes)]
+    hash_seconds = best(lambda: [rp.hash(x) for x in inputs], repeat)
+    trace_seconds = best(lambda: rp.bulk_trace(inputs), repeat)
+    return [
+        {
+            "num_hashes": num_hashes,
+            "hashes_per_second": num_hashes / hash_seconds,
+            "traces_per_second": num_hashes / trace_seconds,
+        }
+    ]
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,10 @@
+"""
+Shared timing helpers, every measurement is the best of several runs since
+the minimum is the least sensitive to scheduler noise.
+"""
+
+import timeit
+
+
+def best(fn, repeat):
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
@@ -0,0 +1,208 @@
+"""
+Cache: Content-addressed on-disk cache of commitments and proofs.
+
+Entries are keyed by a blake2b digest of the input, a codeword, a statement
+or a transcript, together with the parameters that produced them, so equal
+inputs hit the same entry whichever process computed it.
+Each entry is a single file holding a digest of its payload followed by the
+payload, entries failing the digest check on load are deleted and treated as
+misses. Files are written to a temporary name and renamed into place, and the
+least recently used entries, by modification time, are evicted once the
+total size exceeds max_bytes.
+"""
+
+import os
+import pickle
+import tempfile
+from hashlib import blake2b
+from superstark.ff import FieldElement
+from superstark.merkle import MerkleTree
+from superstark.fs import ProofStream
+
+DIGEST_SIZE = 32
+
+
+def digest_values(values, h=None):
+    # digest of a sequence of field elements or integers, each value is length
+    # prefixed so that distinct sequences never share an encoding
+    h = blake2b(digest_size=DIGEST_SIZE) if h is None else h
+    for v in values:
+        v = v.value if isinstance(v, FieldElement) else v
+        encoded = v.to_bytes((v.bit_length() + 7) // 8, "big")
+        h.update(len(encoded).to_bytes(2, "big") + encoded)
+    return h
+
+
+def cache_key(kind, *parts):
+    h = blake2b(kind.encode(), digest_size=DIGEST_SIZE)
+    for part in parts:
+        if isinstance(part, bytes):
+            h.update(b"b" + len(part).to_bytes(8, "big") + part)
+        elif isinstance(part, list):
+            h.update(b"l" + len(part).to_bytes(8, "big"))
+            digest_values(part, h)
+        else:
+            encoded = repr(part).encode()
+            h.update(b"r" + len(encoded).to_bytes(8, "big") + encoded)
+    return h.hexdigest()
+
+
+class ProofCache:
+    def __init__(self, directory, max_bytes=1 << 30) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.total = sum(size for path, size, mtime in self.entries())
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".bin")
+
+    def entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".bin"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries += [(path, stat.st_size, stat.st_mtime_ns)]
+        return entries
+
+    def get(self, key):
+        """
+        Returns the payload stored under key or None, an entry failing its
+        integrity check is removed.
+        """
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        payload = data[DIGEST_SIZE:]
+        if blake2b(payload, digest_size=DIGEST_SIZE).digest() != data[:DIGEST_SIZE]:
+            self.remove(path)
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return payload
+
+    def put(self, key, payload):
+        data = blake2b(payload, digest_size=DIGEST_SIZE).digest() + payload
+        path = self.path(key)
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        self.total += len(data) - previous
+        if self.total > self.max_bytes:
+            self.evict()
+
+    def remove(self, path):
+        try:
+            size = os.path.getsize(path)
+            os.unlink(path)
+            self.total -= size
+        except FileNotFoundError:
+            pass
+
+    def evict(self):
+        # other processes may share the directory, so sizes are re-read
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        self.total = sum(size for path, size, mtime in entries)
+        for path, size, mtime in entries:
+            if self.total <= self.max_bytes:
+                break
+            self.remove(path)
+
+    def clear(self):
+        for path, size, mtime in self.entries():
+            self.remove(path)
+
+    def get_object(self, key):
+        payload = self.get(key)
+        return None if payload is None else pickle.loads(payload)
+
+    def put_object(self, key, obj):
+        self.put(key, pickle.dumps(obj))
+
+    def merkle_tree(self, leafs):
+        """
+        Returns a MerkleTree of the field element leafs, its layers are read
+        from the cache when the same leafs were committed before.
+        """
+        key = cache_key("merkle", leafs)
+        layers = self.get_object(key)
+        if layers is not None:
+            return MerkleTree(leafs, layers)
+        tree = MerkleTree(leafs)
+        self.put_object(key, tree.layers)
+        return tree
+
+    def fri_prove(self, fri, codeword, proof_stream: ProofStream):
+        """
+        FRI.prove through the cache. The FRI transcript depends on what the
+        proof stream already holds so the key covers it, on a hit the cached
+        objects are appended to the proof stream and the opened indices are
+        returned without folding or hashing.
+        """
+        key = cache_key(
+            "fri",
+            proof_stream.serialize(),
+            (
+                fri.field.p,
+                fri.offset.value,
+                fri.omega.value,
+                fri.domain_length,
+                fri.expansion_factor,
+                fri.num_colinearity_tests,
+                fri.remainder_length,
+            ),
+            codeword,
+        )
+        cached = self.get_object(key)
+        if cached is not None:
+            objects, indices = cached
+            proof_stream.objects += objects
+            return indices
+        start = len(proof_stream.objects)
+        indices = fri.prove(codeword, proof_stream)
+        self.put_object(key, (proof_stream.objects[start:], indices))
+        return indices
+
+    def stark_prove(self, stark, trace, transition_constraints, boundary):
+        """
+        STARK.prove through the cache keyed by the statement, the STARK
+        parameters, constraints and boundary, and the trace.
+        """
+        key = cache_key(
+            "stark",
+            (
+                stark.field.p,
+                stark.expansion_factor,
+                stark.num_colinearity_checks,
+                stark.security_level,
+                stark.num_registers,
+                stark.original_trace_length,
+                stark.fri.domain_length,
+            ),
+            tuple(
+                tuple(sorted((k, v.value) for k, v in constraint.dictionary.items()))
+                for constraint in transition_constraints
+            ),
+            tuple((c, r, v.value) for c, r, v in boundary),
+            [v for column in trace for v in column],
+        )
+        proof = self.get(key)
+        if proof is not None:
+            return proof
+        proof = stark.prove(trace, transition_constraints, boundary)
+        self.put(key, proof)
+        return proof
@@ -0,0 +1,131 @@
+"""
+Domain: Evaluation domains {offset * generator^i} and their precomputed tables.
+
+Domains are shared process-wide through an LRU cache keyed by
+(p, offset, generator, size), so repeated proofs with the same parameters
+pay for domain setup once.
+Every table is computed by successive multiplication the first time it is
+requested and kept for the lifetime of the cache entry.
+    points : the domain elements in order.
+    inverses : their multiplicative inverses.
+    twiddles : generator^i for i < size/2, the NTT twiddle factors.
+    bit_reversal : the bit-reversal permutation of range(size).
+    squared : the domain of squares, the next round of FRI folding.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from superstark.ff import FieldElement, FiniteField
+
+
+class Domain:
+    def __init__(self, p, offset, generator, size) -> None:
+        self.p = p
+        self.offset = offset
+        self.generator = generator
+        self.size = size
+        self.field = FiniteField(p)
+
+        self.values = [0] * size
+        acc = offset % p
+        for i in range(size):
+            self.values[i] = acc
+            acc = acc * generator % p
+
+        self.points_ = None
+        self.inverses_ = None
+        self.twiddles_ = None
+        self.bit_reversal_ = None
+
+    def __len__(self):
+        return self.size
+
+    def points(self):
+        if self.points_ is None:
+            self.points_ = [FieldElement(v, self.field) for v in self.values]
+        return self.points_
+
+    def inverses(self):
+        # (offset * generator^i)^-1 = offset^-1 * (generator^-1)^i
+        if self.inverses_ is None:
+            p = self.p
+            step = pow(self.generator, -1, p)
+            acc = pow(self.offset, -1, p)
+            inverses = [0] * self.size
+            for i in range(self.size):
+                inverses[i] = acc
+                acc = acc * step % p
+            self.inverses_ = inverses
+        return self.inverses_
+
+    def twiddles(self):
+        if self.twiddles_ is None:
+            if self.offset % self.p == 1:
+                self.twiddles_ = self.values[: self.size // 2]
+            else:
+                self.twiddles_ = lookup(self.p, 1, self.generator, self.size).twiddles()
+        return self.twiddles_
+
+    def bit_reversal(self):
+        if self.bit_reversal_ is None:
+            n = self.size
+            bits = len(bin(n)) - 3
+            self.bit_reversal_ = [
+                int(bin(i)[2:].zfill(bits)[::-1], 2) if bits > 0 else 0
+                for i in range(n)
+            ]
+        return self.bit_reversal_
+
+    def squared(self):
+        p = self.p
+        return lookup(
+            p,
+            self.offset * self.offset % p,
+            self.generator * self.generator % p,
+            self.size // 2,
+        )
+
+
+class DomainCache:
+    """
+    LRU cache of domains, evicting the least recently used domains once the
+    total number of cached domain points exceeds max_points.
+    """
+
+    def __init__(self, max_points=1 << 22) -> None:
+        self.max_points = max_points
+        self.domains = OrderedDict()
+        self.num_points = 0
+        self.lock = Lock()
+
+    def lookup(self, p, offset, generator, size):
+        key = (p, offset % p, generator % p, size)
+        with self.lock:
+            if key in self.domains:
+                self.domains.move_to_end(key)
+                return self.domains[key]
+        domain = Domain(p, offset, generator, size)
+        with self.lock:
+            if key not in self.domains:
+                self.domains[key] = domain
+                self.num_points += size
+                while self.num_points > self.max_points and len(self.domains) > 1:
+                    evicted_key, evicted = self.domains.popitem(last=False)
+                    self.num_points -= evicted.size
+            return self.domains[key]
+
+    def clear(self):
+        with self.lock:
+            self.domains.clear()
+            self.num_points = 0
+
+
+DOMAINS = DomainCache()
+
+
+def lookup(p, offset, generator, size):
+    return DOMAINS.lookup(p, offset, generator, size)
+
+
+def get_domain(offset: FieldElement, generator: FieldElement, size: int) -> Domain:
+    return DOMAINS.lookup(offset.field.p, offset.value, generator.value, size)
@@ -8,5 +8,23 @@ def xgcd(x: int, y: int):
         old_r, r = (r, old_r - quo * r)
         old_s, s = (s, old_s - quo * s)
         old_t, t = (t, old_t - quo * t)
-    (a, b, d) = (old_s, old_t, old_r)
+    a, b, d = (old_s, old_t, old_r)
     return a, b, d  # a,b are Bezout coefficient and d is the GCD
+
+
+# batch inversion (Montgomery's trick) trades n inversions modulo p for one
+# inversion and 3(n-1) multiplications
+def batch_inverse(values, p):
+    prefix = [1] * len(values)
+    acc = 1
+    for i in range(len(values)):
+        prefix[i] = acc
+        acc = acc * values[i] % p
+    assert acc % p != 0, "cannot invert zero"
+    a, b, g = xgcd(acc, p)
+    acc = a % p
+    inverses = [0] * len(values)
+    for i in reversed(range(len(values))):
+        inverses[i] = acc * prefix[i] % p
+        acc = acc * values[i] % p
+    return inverses
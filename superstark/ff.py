@@ -1,11 +1,104 @@
 """
 FieldElement : Implementation of Finite Fields.
+
+Fields with a registered FieldProfile know their generator and two-adic roots
+of unity, besides the 128-bit STARK field profiles are registered for the
+Goldilocks (2^64 - 2^32 + 1) and BabyBear (2^31 - 2^27 + 1) primes whose
+elements fit in native machine words.
+Quadratic and cubic extensions of the small fields are available, but the
+STARK and FRI challenges, combination weights and folding randomness, are
+still drawn from the base field. Over Goldilocks or BabyBear soundness is
+therefore capped near log2(p) bits per challenge, whatever the number of
+colinearity tests, until the combination and FRI run over an extension.
 """
+
 from __future__ import annotations
-from .fastmath import xgcd
+from array import array
+from .fastmath import batch_inverse
+
+
+class FieldProfile:
+    """
+    Known constants of a prime field.
+        generator : generator of the multiplicative group, used as coset offset.
+        two_adicity : largest k such that 2^k divides p - 1.
+        two_adic_root : primitive root of unity of order 2^two_adicity.
+        typecode : array typecode of the machine word holding an element, or
+        None if elements do not fit in a native word.
+        non_residues : map from extension degree k to W such that x^k - W is
+        irreducible.
+    """
+
+    def __init__(
+        self, name, p, generator, two_adicity, two_adic_root, typecode, non_residues
+    ):
+        self.name = name
+        self.p = p
+        self.generator = generator
+        self.two_adicity = two_adicity
+        self.two_adic_root = two_adic_root
+        self.typecode = typecode
+        self.non_residues = non_residues
+
+
+FIELD_PROFILES = dict()
+
+
+def register_profile(profile: FieldProfile):
+    FIELD_PROFILES[profile.p] = profile
+
+
+# the historical STARK field uses its 2^119-th root of unity as generator
+register_profile(
+    FieldProfile(
+        "stark",
+        1 + 407 * (1 << 119),
+        85408008396924667383611388730472331217,
+        119,
+        85408008396924667383611388730472331217,
+        None,
+        {},
+    )
+)
+register_profile(
+    FieldProfile(
+        "goldilocks",
+        (1 << 64) - (1 << 32) + 1,
+        7,
+        32,
+        1753635133440165772,
+        "Q",
+        {2: 7, 3: 7},
+    )
+)
+register_profile(
+    FieldProfile(
+        "babybear",
+        (1 << 31) - (1 << 27) + 1,
+        31,
+        27,
+        440564289,
+        "I",
+        {2: 31, 3: 31},
+    )
+)
+
+
+# allocates an element without calling __init__, the arithmetic hot paths
+# fill in the slots themselves
+new_element = object.__new__
 
 
 class FieldElement:
+    """
+    Element of a prime field.
+    Elements are slotted and immutable, arithmetic reduces raw integers in
+    place of dispatching through FiniteField, and Python integers mix freely
+    on either side of an operator.
+    """
+
+    __slots__ = ("value", "field")
+
     def __init__(self, value: int, field: FiniteField) -> None:
         self.value = value
         self.field = field
@@ -13,42 +106,96 @@ class FieldElement:
     def __repr__(self) -> str:
         return f"{self.value}"
 
-    def __add__(self, right: FieldElement):
-        return self.field.add(self, right)
+    def __add__(self, right):
+        field = self.field
+        if type(right) is FieldElement:
+            value = right.value
+        elif type(right) is int:
+            value = right
+        else:
+            # extension elements and other operands take their reflected method
+            return NotImplemented
+        result = new_element(FieldElement)
+        result.value = (self.value + value) % field.p
+        result.field = field
+        return result
 
-    def __mul__(self, right: FieldElement):
-        return self.field.mul(self, right)
+    __radd__ = __add__
 
-    def __sub__(self, right: FieldElement):
-        return self.field.sub(self, right)
+    def __mul__(self, right):
+        field = self.field
+        if type(right) is FieldElement:
+            value = right.value
+        elif type(right) is int:
+            value = right
+        else:
+            return NotImplemented
+        result = new_element(FieldElement)
+        result.value = self.value * value % field.p
+        result.field = field
+        return result
+
+    __rmul__ = __mul__
+
+    def __sub__(self, right):
+        field = self.field
+        if type(right) is FieldElement:
+            value = right.value
+        elif type(right) is int:
+            value = right
+        else:
+            return NotImplemented
+        result = new_element(FieldElement)
+        result.value = (self.value - value) % field.p
+        result.field = field
+        return result
 
-    def __truediv__(self, right: FieldElement):
-        return self.field.div(self, right)
+    def __rsub__(self, left: int):
+        field = self.field
+        return FieldElement((left - self.value) % field.p, field)
+
+    def __truediv__(self, right):
+        field = self.field
+        if type(right) is FieldElement:
+            value = right.value
+        elif type(right) is int:
+            value = right
+        else:
+            return NotImplemented
+        assert value % field.p != 0, "cannot divide by zero"
+        return FieldElement(self.value * pow(value, -1, field.p) % field.p, field)
+
+    def __rtruediv__(self, left: int):
+        return self.inv() * left
 
     def __neg__(self):
-        return self.field.neg(self)
+        field = self.field
+        return FieldElement((field.p - self.value) % field.p, field)
 
     def inv(self):
-        return self.field.inv(self)
+        field = self.field
+        assert self.value % field.p != 0, "cannot invert zero"
+        return FieldElement(pow(self.value, -1, field.p), field)
 
     # modular exponentiation -- be sure to encapsulate in parentheses!
     def __xor__(self, exponent: int):
-        acc = FieldElement(1, self.field)
-        val = FieldElement(self.value, self.field)
-        for i in reversed(range(len(bin(exponent)[2:]))):
-            acc = acc * acc
-            if (1 << i) & exponent != 0:
-                acc = acc * val
-        return acc
+        return FieldElement(pow(self.value, exponent, self.field.p), self.field)
 
     def __pow__(self, exponent: int):
-        return self.__xor__(self, exponent)
+        return self.__xor__(exponent)
 
-    def __eq__(self, other: FieldElement):
+    def __eq__(self, other):
+        if type(other) is int:
+            return self.value == other % self.field.p
+        if type(other) is not FieldElement:
+            return NotImplemented
         return self.value == other.value
 
-    def __neq__(self, other: FieldElement):
-        return self.value != other.value
+    def __neq__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.value)
 
     def __str__(self):
         return str(self.value)
@@ -57,15 +204,19 @@ class FieldElement:
         return bytes(str(self).encode())
 
     def is_zero(self):
-        if self.value == 0:
-            return True
-        else:
-            return False
+        return self.value == 0
 
 
 class FiniteField:
     def __init__(self, p) -> None:
         self.p = p
+        self.profile = FIELD_PROFILES.get(p)
+
+    def from_profile(name: str) -> FiniteField:
+        for profile in FIELD_PROFILES.values():
+            if profile.name == name:
+                return FiniteField(profile.p)
+        assert False, f"Unknown field profile {name}."
 
     def __repr__(self) -> str:
         return f"F/{self.p}"
@@ -89,36 +240,261 @@ class FiniteField:
         return FieldElement((self.p - operand.value) % self.p, self)
 
     def inv(self, operand: FieldElement) -> FieldElement:
-        a, b, g = xgcd(operand.value, self.p)
-        return FieldElement(((a % self.p) + self.p) % self.p, self)
+        return operand.inv()
 
     def div(self, l: FieldElement, r: FieldElement) -> FieldElement:
-        assert not r.is_zero()
-        a, b, g = xgcd(r.value, self.p)
-        return FieldElement((l.value * a % self.p), self)
+        return l / r
 
-    def generator(self):
-        assert self.p == 1 + 407 * (
-            1 << 119
-        ), "Do not know generator for other fields beyond 1+407*2^119"
-        return FieldElement(85408008396924667383611388730472331217, self)
-
-    def primitive_nth_root(self, n: FieldElement):
-        if self.p == 1 + 407 * (1 << 119):
-            assert (
-                n <= 1 << 119 and (n & (n - 1)) == 0
-            ), "Field does not have nth root of unity where n > 2^119 or not power of two."
-            root = FieldElement(85408008396924667383611388730472331217, self)
-            order = 1 << 119
-            while order != n:
-                root = root ^ 2
-                order = order / 2
-            return root
-        else:
-            assert False, "Unknown field, can't return root of unity."
+    # accumulation helpers reduce once after folding all raw values
+    def sum(self, operands) -> FieldElement:
+        acc = 0
+        for o in operands:
+            acc += o.value
+        return FieldElement(acc % self.p, self)
 
-    def sample(self, byte_array):
+    def product(self, operands) -> FieldElement:
+        p = self.p
+        acc = 1
+        for o in operands:
+            acc = acc * o.value % p
+        return FieldElement(acc, self)
+
+    def accumulator(self) -> FieldAccumulator:
+        return FieldAccumulator(self)
+
+    def dot(self, lhs, rhs) -> FieldElement:
+        # sum(a_i * b_i) over unreduced products
         acc = 0
-        for b in byte_array:
-            acc = (acc << 8) ^ int(b)
+        for a, b in zip(lhs, rhs):
+            acc += a.value * b.value
         return FieldElement(acc % self.p, self)
+
+    def horner(self, coefficients, point) -> FieldElement:
+        # sum(c_i * x^i), reducing once per coefficient instead of after
+        # every addition and multiplication
+        p = self.p
+        x = point.value
+        acc = 0
+        for c in reversed(coefficients):
+            acc = (acc * x + c.value) % p
+        return FieldElement(acc, self)
+
+    def batch_inverse(self, operands):
+        return [
+            FieldElement(v, self)
+            for v in batch_inverse([o.value for o in operands], self.p)
+        ]
+
+    def generator(self):
+        assert self.profile is not None, "Do not know generator for unregistered fields"
+        return FieldElement(self.profile.generator, self)
+
+    def has_nth_root(self, n: int) -> bool:
+        return (
+            self.profile is not None
+            and n & (n - 1) == 0
+            and 0 < n <= 1 << self.profile.two_adicity
+        )
+
+    def primitive_nth_root(self, n: int):
+        assert self.profile is not None, "Unknown field, can't return root of unity."
+        assert self.has_nth_root(n), (
+            "Field does not have nth root of unity where "
+            f"n > 2^{self.profile.two_adicity} or not power of two."
+        )
+        exponent = (1 << self.profile.two_adicity) // n
+        return FieldElement(pow(self.profile.two_adic_root, exponent, self.p), self)
+
+    def sample(self, byte_array):
+        return FieldElement(int.from_bytes(byte_array, "big") % self.p, self)
+
+    # word packing stores a column of elements in native machine words when
+    # the profile allows it, the result supports the buffer protocol and can
+    # be wrapped without copies by array libraries
+    def pack(self, elements):
+        values = [e.value for e in elements]
+        if self.profile is None or self.profile.typecode is None:
+            return values
+        return array(self.profile.typecode, values)
+
+    def unpack(self, words):
+        return [FieldElement(int(w), self) for w in words]
+
+    def extension(self, degree: int) -> ExtensionField:
+        assert (
+            self.profile is not None and degree in self.profile.non_residues
+        ), f"No known irreducible binomial of degree {degree} over {self}"
+        return ExtensionField(self, degree, self.profile.non_residues[degree])
+
+
+class FieldAccumulator:
+    """
+    Accumulates sums of field elements and of products of field elements as
+    an unreduced Python integer, reducing modulo p only when the value is
+    read.
+    """
+
+    __slots__ = ("acc", "field")
+
+    def __init__(self, field: FiniteField) -> None:
+        self.acc = 0
+        self.field = field
+
+    def add(self, operand):
+        self.acc += operand if type(operand) is int else operand.value
+
+    def add_product(self, l, r):
+        self.acc += l.value * r.value
+
+    def add_dot(self, lhs, rhs):
+        acc = self.acc
+        for a, b in zip(lhs, rhs):
+            acc += a.value * b.value
+        self.acc = acc
+
+    def value(self) -> FieldElement:
+        return FieldElement(self.acc % self.field.p, self.field)
+
+
+class ExtensionFieldElement:
+    """
+    Element of F_p[x] / (x^k - W) stored as k integer coefficients, lowest
+    degree first.
+    """
+
+    def __init__(self, coefficients, field: ExtensionField) -> None:
+        self.coefficients = tuple(coefficients)
+        self.field = field
+
+    def __repr__(self) -> str:
+        return f"{list(self.coefficients)}"
+
+    def __add__(self, right):
+        return self.field.add(self, self.field.lift(right))
+
+    def __mul__(self, right):
+        return self.field.mul(self, self.field.lift(right))
+
+    __radd__ = __add__
+    __rmul__ = __mul__
+
+    def __sub__(self, right):
+        return self.field.sub(self, self.field.lift(right))
+
+    def __rsub__(self, left):
+        return self.field.sub(self.field.lift(left), self)
+
+    def __truediv__(self, right):
+        return self.field.mul(self, self.field.inv(self.field.lift(right)))
+
+    def __rtruediv__(self, left):
+        return self.field.mul(self.field.lift(left), self.field.inv(self))
+
+    def __neg__(self):
+        return self.field.neg(self)
+
+    def inv(self):
+        return self.field.inv(self)
+
+    def __xor__(self, exponent: int):
+        acc = self.field.one()
+        for b in bin(exponent)[2:]:
+            acc = acc * acc
+            if b == "1":
+                acc = acc * self
+        return acc
+
+    def __eq__(self, other):
+        return self.coefficients == self.field.lift(other).coefficients
+
+    def __hash__(self):
+        # embedded base field elements hash like the base field element
+        if all(c == 0 for c in self.coefficients[1:]):
+            return hash(self.coefficients[0])
+        return hash(self.coefficients)
+
+    def __str__(self):
+        return str(list(self.coefficients))
+
+    def __bytes__(self):
+        return bytes(str(self).encode())
+
+    def is_zero(self):
+        return all(c == 0 for c in self.coefficients)
+
+
+class ExtensionField:
+    """
+    Binomial extension F_p[x] / (x^k - W) of a prime field, used to draw
+    challenges with enough entropy when the base field is small.
+    """
+
+    def __init__(self, base: FiniteField, degree: int, non_residue: int) -> None:
+        self.base = base
+        self.degree = degree
+        self.non_residue = non_residue
+        self.p = base.p
+
+    def __repr__(self) -> str:
+        return f"F/{self.p}[x]/(x^{self.degree} - {self.non_residue})"
+
+    def zero(self) -> ExtensionFieldElement:
+        return ExtensionFieldElement([0] * self.degree, self)
+
+    def one(self) -> ExtensionFieldElement:
+        return ExtensionFieldElement([1] + [0] * (self.degree - 1), self)
+
+    def lift(self, operand):
+        # embeds base field elements and integers
+        if isinstance(operand, ExtensionFieldElement):
+            return operand
+        value = operand.value if isinstance(operand, FieldElement) else operand
+        return ExtensionFieldElement([value % self.p] + [0] * (self.degree - 1), self)
+
+    def add(self, l, r):
+        return ExtensionFieldElement(
+            [(a + b) % self.p for a, b in zip(l.coefficients, r.coefficients)], self
+        )
+
+    def sub(self, l, r):
+        return ExtensionFieldElement(
+            [(a - b) % self.p for a, b in zip(l.coefficients, r.coefficients)], self
+        )
+
+    def neg(self, operand):
+        return ExtensionFieldElement(
+            [(-a) % self.p for a in operand.coefficients], self
+        )
+
+    def mul(self, l, r):
+        # schoolbook product, terms of degree >= k wrap around times W
+        k = self.degree
+        acc = [0] * k
+        for i, a in enumerate(l.coefficients):
+            if a == 0:
+                continue
+            for j, b in enumerate(r.coefficients):
+                if i + j < k:
+                    acc[i + j] += a * b
+                else:
+                    acc[i + j - k] += a * b * self.non_residue
+        return ExtensionFieldElement([c % self.p for c in acc], self)
+
+    def inv(self, operand):
+        # a^(p^k - 2) by Fermat's little theorem in the extension
+        assert not operand.is_zero(), "cannot invert zero"
+        return operand ^ (self.p**self.degree - 2)
+
+    def div(self, l, r):
+        return self.mul(l, self.inv(r))
+
+    def sample(self, byte_array):
+        # one coefficient per equal share of the randomness
+        width = len(byte_array) // self.degree
+        return ExtensionFieldElement(
+            [
+                int.from_bytes(byte_array[i * width : (i + 1) * width], "big") % self.p
+                for i in range(self.degree)
+            ],
+            self,
+        )
@@ -12,11 +12,15 @@ polynomial over a domain.
     expansion_factor: blowup factor of the domain.
     num_colinearity_tests: a security parameter.
 """
-from hashlib import blake2b
+
+import tempfile
 from superstark.ff import FieldElement
-from superstark.merkle import Merkle
+from superstark.merkle import Merkle, MerkleTree, SpilledMerkleTree
 from superstark.poly import Univariate
-from superstark.fs import ProofStream
+from superstark.fs import ProofStream, Sampler
+from superstark.ntt import fast_coset_interpolate
+from superstark.domain import get_domain
+from superstark.profiling import phase
 
 
 class FRI:
@@ -27,6 +31,7 @@ class FRI:
         initial_domain_length,
         expansion_factor,
         num_colinearity_tests,
+        remainder_length=None,
     ):
         self.offset = offset
         self.omega: FieldElement = omega
@@ -34,9 +39,25 @@ class FRI:
         self.field = omega.field
         self.expansion_factor = expansion_factor
         self.num_colinearity_tests = num_colinearity_tests
+        # length of the last codeword, sent in the clear, by default folding
+        # stops once the codeword is no longer than 4 * num_colinearity_tests
+        self.remainder_length = remainder_length
+        if remainder_length is not None:
+            assert (
+                remainder_length & (remainder_length - 1) == 0
+                and expansion_factor <= remainder_length <= initial_domain_length
+            ), (
+                "remainder length must be a power of two between expansion factor "
+                "and domain length"
+            )
+            assert (
+                num_colinearity_tests <= remainder_length
+            ), "remainder length must be at least the number of colinearity tests"
 
     def num_rounds(self):
         codeword_length = self.domain_length
+        if self.remainder_length is not None:
+            return len(bin(codeword_length // self.remainder_length)) - 2
         num_rounds = 0
         while (
             codeword_length > self.expansion_factor
@@ -44,31 +65,43 @@ class FRI:
         ):
             codeword_length /= 2
             num_rounds += 1
-
-            return num_rounds
+        return num_rounds
 
     def eval_domain(self):
-        return [self.offset * (self.omega ^ i) for i in range(self.domain_length)]
+        return get_domain(self.offset, self.omega, self.domain_length).points()
+
+    # a single point of the domain, for verifiers that only need the queried
+    # points and would otherwise build the whole domain
+    def eval_point(self, index):
+        return self.offset * (self.omega ^ index)
 
     def commit(self, codeword, proof_stream: ProofStream, round_index=0):
-        one = self.field.one()
-        two = FieldElement(2, self.field)
-        omega = self.omega
-        offset = self.offset
-        codewords = []
+        return [tree.leafs for tree in self.commit_trees(codeword, proof_stream)]
+
+    def commit_trees(self, codeword, proof_stream: ProofStream, spill=None):
+        """
+        Runs the commit phase and returns the Merkle tree of every round.
+        When a spill file is given each round's codeword is written to it
+        and dropped once hashed, so only the codeword being folded and the
+        trees are kept in memory.
+        """
+        field = self.field
+        p = field.p
+        two_inv = pow(2, -1, p)
+        domain = get_domain(self.offset, self.omega, self.domain_length)
+        values = [c.value for c in codeword]
+        trees = []
 
         # for each round run the commit loop
         for round in range(self.num_rounds()):
-            N = len(codeword)
-            print("Omega^(n-1) :", omega ^ (N - 1))
-            print("Omega.inv()", omega.inv())
-            # make sure omega has the right order
-            assert (
-                omega ^ (N - 1) == omega.inv()
-            ), "error in commit: omega does not have the right order!"
             # compute and write the merkle root to the fs transcript
-            root = Merkle.commit(codeword)
-            proof_stream.push(root)
+            with phase("fri.merkle"):
+                if spill is None:
+                    tree = MerkleTree([FieldElement(v, field) for v in values])
+                else:
+                    tree = SpilledMerkleTree(values, field, spill)
+            proof_stream.push(tree.root())
+            trees += [tree]
 
             # check if last round
             if round == self.num_rounds() - 1:
@@ -77,98 +110,109 @@ class FRI:
 
             # sample challenge scalar using the transcript
             # as source of randomness
-            alpha = self.field.sample(proof_stream.prover())
-            # collect round codeword
-            codewords += [codeword]
-            # run the split and fold routine
-            codeword = [
-                two.inv()
-                * (
-                    (one + alpha / (offset * (omega ^ i))) * codeword[i]
-                    + (one - alpha / (offset * omega ^ i))
-                )
-                * codeword[len(codeword) // 2 + i]
-                for i in range(len(codeword) // 2)
-            ]
-            omega = omega ^ 2
-            offset = offset ^ 2
+            with phase("fri.sample"):
+                alpha = field.sample(proof_stream.prover())
+            # run the split and fold routine, alpha / x is read off the
+            # cached inverses of the round domain
+            with phase("fri.fold"):
+                half = len(values) // 2
+                inverses = domain.inverses()
+                a = alpha.value
+                values = [
+                    two_inv
+                    * (
+                        (1 + a * inverses[i]) * values[i]
+                        + (1 - a * inverses[i]) * values[half + i]
+                    )
+                    % p
+                    for i in range(half)
+                ]
+                domain = domain.squared()
         # send the last codeword
-        proof_stream.push(codeword)
-        # collect final codeword
-        codewords += [codeword]
-        return codewords
+        proof_stream.push([FieldElement(v, field) for v in values])
+        return trees
+
+    def query(self, current_tree, next_tree, c_indices, proof_stream: ProofStream):
+        # rounds may be given as plain codewords or as committed trees
+        if isinstance(current_tree, list):
+            current_tree = MerkleTree(current_tree)
+        if isinstance(next_tree, list):
+            next_tree = MerkleTree(next_tree)
 
-    def query(
-        self, current_codeword, next_codeword, c_indices, proof_stream: ProofStream
-    ):
         # extract a and b indices
         a_indices = [index for index in c_indices]
-        b_indices = [index + len(current_codeword) // 2 for index in c_indices]
+        b_indices = [index + len(current_tree) // 2 for index in c_indices]
 
         # reveal leafs
         for s in range(self.num_colinearity_tests):
             proof_stream.push(
                 (
-                    current_codeword[a_indices[s]],
-                    current_codeword[b_indices[s]],
-                    next_codeword[c_indices[s]],
+                    current_tree.leaf(a_indices[s]),
+                    current_tree.leaf(b_indices[s]),
+                    next_tree.leaf(c_indices[s]),
                 )
             )
         # reveal authentication paths
         for s in range(self.num_colinearity_tests):
-            proof_stream.push(Merkle.open(a_indices[s], current_codeword))
-            proof_stream.push(Merkle.open(b_indices[s], current_codeword))
-            proof_stream.push(Merkle.open(c_indices), next_codeword)
+            proof_stream.push(current_tree.open(a_indices[s]))
+            proof_stream.push(current_tree.open(b_indices[s]))
+            proof_stream.push(next_tree.open(c_indices[s]))
 
         return a_indices + b_indices
 
-    def sample_index(bs, size):
-        acc = 0
-        for b in bs:
-            acc = (acc << 8) ^ int(b)
-        return acc % size
-
     def sample_indices(self, seed, size, reduced_size, number):
-        assert number <= reduced_size
-        assert number <= 2 * reduced_size
-        indices = []
-        reduced_indices = []
-        counter = 0
-        while len(indices) < number:
-            index = FRI.sample_index(blake2b(seed + bytes(counter)).digest(), size)
-            reduced_index = index % reduced_size
-            counter += 1
-            if reduced_index not in reduced_indices:
-                indices += [index]
-                reduced_indices += [reduced_index]
-        return indices
-
-    def prove(self, codeword, proof_stream: ProofStream):
+        return Sampler(seed).indices(number, size, reduced_size)
+
+    def prove(self, codeword, proof_stream: ProofStream, low_memory=False):
+        """
+        Proves the codeword has low degree, returning the indices opened in
+        the initial codeword.
+        In low memory mode round codewords are spilled to a temporary file
+        and read back only at the queried indices.
+        """
         assert self.domain_length == len(
             codeword
         ), "initial domain length does not match codeword length"
 
-        # commit
-        codewords = self.commit(codeword, proof_stream)
-        # sample indices
-        top_lvl_indices = self.sample_indices(
-            proof_stream.prover(),
-            len(codewords[0]),
-            len(codewords[-1]),
-            self.num_colinearity_tests,
-        )
-        indices = [index for index in top_lvl_indices]
-
-        # query
-        for i in range(len(codewords) - 1):
-            # indices are re-used modulo codeword size as a security feature
-            indices = [index % len(codewords[i]) // 2 for index in indices]
-            self.query(codewords[i], codewords[i + 1], indices, proof_stream)
-        return top_lvl_indices
+        spill = tempfile.TemporaryFile() if low_memory else None
+        try:
+            # commit
+            with phase("fri.commit"):
+                trees = self.commit_trees(codeword, proof_stream, spill)
+            # sample indices
+            with phase("fri.sample"):
+                top_lvl_indices = self.sample_indices(
+                    proof_stream.prover(),
+                    len(trees[0]) // 2,
+                    len(trees[-1]),
+                    self.num_colinearity_tests,
+                )
+            indices = [index for index in top_lvl_indices]
+
+            # query, the first round reveals the a and b indices of the
+            # initial codeword which are returned to the caller
+            opened_indices = []
+            for i in range(len(trees) - 1):
+                # indices are re-used modulo codeword size as a security feature
+                indices = [index % (len(trees[i]) // 2) for index in indices]
+                with phase("fri.open"):
+                    queried = self.query(trees[i], trees[i + 1], indices, proof_stream)
+                if i == 0:
+                    opened_indices = queried
+            return opened_indices
+        finally:
+            if spill is not None:
+                spill.close()
 
     def verify(self, proof_stream, polynomial_values):
-        omega = self.omega
+        with phase("fri.verify"):
+            return self.verify_(proof_stream, polynomial_values)
+
+    def verify_(self, proof_stream, polynomial_values):
+        # the round domain is tracked by its offset and generator, only the
+        # queried points are ever computed
         offset = self.offset
+        omega = self.omega
 
         # extract all roots and alphas
         roots = []
@@ -187,11 +231,8 @@ class FRI:
 
         # check if it is low degree
         degree = (len(last_codeword) // self.expansion_factor) - 1
-        last_omega = omega
-        last_offset = offset
-        for r in range(self.num_rounds() - 1):
-            last_omega = last_omega ^ 2
-            last_offset = last_offset ^ 2
+        last_omega = omega ^ (1 << (self.num_rounds() - 1))
+        last_offset = offset ^ (1 << (self.num_rounds() - 1))
 
         # assert that last_omega has the right order
         assert last_omega.inv() == last_omega ^ (
@@ -199,17 +240,7 @@ class FRI:
         ), "omega does not have right order"
 
         # compute interpolant
-        last_domain = [
-            last_offset * (last_omega ^ i) for i in range(len(last_codeword))
-        ]
-        poly = Univariate.interpolate_domain(last_domain, last_codeword)
-        # coefficients = intt(last_omega, last_codeword)
-        # poly = Polynomial(coefficients).scale(last_offset.inverse())
-
-        # verify by  evaluating
-        assert (
-            poly.evaluate_domain(last_domain) == last_codeword
-        ), "re-evaluated codeword does not match original!"
+        poly = fast_coset_interpolate(last_codeword, last_offset, last_omega)
         if poly.degree() > degree:
             print(
                 "last codeword does not correspond to polynomial of low enough degree"
@@ -239,45 +270,50 @@ class FRI:
             b_indices = [index + (self.domain_length >> (r + 1)) for index in a_indices]
 
             # read values and check colinearity
-            aa = []
-            bb = []
-            cc = []
-            for s in range(self.num_colinearity_tests):
-                (ay, by, cy) = proof_stream.pull()
-                aa += [ay]
-                bb += [by]
-                cc += [cy]
-
-                # record top-layer values for later verification
-                if r == 0:
-                    polynomial_values += [(a_indices[s], ay), (b_indices[s], by)]
-
-                # colinearity check
-                ax = offset * (omega ^ a_indices[s])
-                bx = offset * (omega ^ b_indices[s])
-                cx = alphas[r]
-                if Univariate.test_colinearity([(ax, ay), (bx, by), (cx, cy)]) == False:
-                    print("colinearity check failure")
-                    return False
+            with phase("fri.verify.colinearity"):
+                aa = []
+                bb = []
+                cc = []
+                for s in range(self.num_colinearity_tests):
+                    ay, by, cy = proof_stream.pull()
+                    aa += [ay]
+                    bb += [by]
+                    cc += [cy]
+
+                    # record top-layer values for later verification
+                    if r == 0:
+                        polynomial_values += [(a_indices[s], ay), (b_indices[s], by)]
+
+                    # colinearity check
+                    ax = offset * (omega ^ a_indices[s])
+                    bx = offset * (omega ^ b_indices[s])
+                    cx = alphas[r]
+                    if (
+                        Univariate.test_colinearity([(ax, ay), (bx, by), (cx, cy)])
+                        == False
+                    ):
+                        print("colinearity check failure")
+                        return False
 
             # verify authentication paths
-            for i in range(self.num_colinearity_tests):
-                path = proof_stream.pull()
-                if Merkle.verify(roots[r], a_indices[i], path, aa[i]) == False:
-                    print("merkle authentication path verification fails for aa")
-                    return False
-                path = proof_stream.pull()
-                if Merkle.verify(roots[r], b_indices[i], path, bb[i]) == False:
-                    print("merkle authentication path verification fails for bb")
-                    return False
-                path = proof_stream.pull()
-                if Merkle.verify(roots[r + 1], c_indices[i], path, cc[i]) == False:
-                    print("merkle authentication path verification fails for cc")
-                    return False
-
-            # square omega and offset to prepare for next round
-            omega = omega ^ 2
-            offset = offset ^ 2
+            with phase("fri.verify.merkle"):
+                for i in range(self.num_colinearity_tests):
+                    path = proof_stream.pull()
+                    if Merkle.verify(roots[r], a_indices[i], path, aa[i]) == False:
+                        print("merkle authentication path verification fails for aa")
+                        return False
+                    path = proof_stream.pull()
+                    if Merkle.verify(roots[r], b_indices[i], path, bb[i]) == False:
+                        print("merkle authentication path verification fails for bb")
+                        return False
+                    path = proof_stream.pull()
+                    if Merkle.verify(roots[r + 1], c_indices[i], path, cc[i]) == False:
+                        print("merkle authentication path verification fails for cc")
+                        return False
+
+            # square the domain to prepare for next round
+            offset = offset * offset
+            omega = omega * omega
 
         # all checks passed
         return True
@@ -0,0 +1,234 @@
+"""
+FRI Planner: Chooses FRI parameters for a degree bound and security target.
+
+Candidates range over blowup factors and remainder lengths, the number of
+colinearity tests follows from the conjectured soundness of FRI where every
+query contributes log2(expansion_factor) bits of security.
+Each candidate's prover time, verifier time and proof size are predicted
+from operation counts weighted by a MachineProfile, and the planner returns
+the candidate minimizing the chosen objective.
+Folding is always by two, the folding schedule of a plan is the list of
+codeword lengths committed to, from the initial domain to the remainder.
+"""
+
+import timeit
+from hashlib import blake2b
+from superstark.ff import FieldElement, FiniteField
+from superstark.fri import FRI
+
+OBJECTIVES = ("prover", "verifier", "size")
+HASH_SIZE = 32
+
+
+class MachineProfile:
+    """
+    Costs in nanoseconds of the operations dominating FRI, a modular
+    multiplication, a modular inversion, hashing a field element leaf and
+    hashing two child digests into their parent.
+    """
+
+    def __init__(self, mul_ns, inv_ns, leaf_hash_ns, node_hash_ns) -> None:
+        self.mul_ns = mul_ns
+        self.inv_ns = inv_ns
+        self.leaf_hash_ns = leaf_hash_ns
+        self.node_hash_ns = node_hash_ns
+
+    def measure(field: FiniteField, size=1024, repeat=5):
+        p = field.p
+        xs = [pow(3, i + 1, p) for i in range(size)]
+        ys = [pow(5, i + 1, p) for i in range(size)]
+        leafs = [FieldElement(x, field) for x in xs]
+        nodes = [blake2b(bytes(x)).digest() * 2 for x in leafs]
+
+        def best(fn):
+            return min(timeit.repeat(fn, number=1, repeat=repeat)) / size * 1e9
+
+        return MachineProfile(
+            best(lambda: [x * y % p for x, y in zip(xs, ys)]),
+            best(lambda: [pow(x, -1, p) for x in xs]),
+            best(lambda: [blake2b(bytes(x)).digest() for x in leafs]),
+            best(lambda: [blake2b(n).digest() for n in nodes]),
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"MachineProfile(mul_ns={self.mul_ns:.1f}, inv_ns={self.inv_ns:.1f}, "
+            f"leaf_hash_ns={self.leaf_hash_ns:.1f}, "
+            f"node_hash_ns={self.node_hash_ns:.1f})"
+        )
+
+
+def log2(n):
+    return len(bin(n)) - 3
+
+
+class FRIPlan:
+    def __init__(
+        self,
+        degree,
+        expansion_factor,
+        num_colinearity_tests,
+        remainder_length,
+        field: FiniteField,
+        profile: MachineProfile,
+    ) -> None:
+        self.degree = degree
+        self.expansion_factor = expansion_factor
+        self.num_colinearity_tests = num_colinearity_tests
+        self.remainder_length = remainder_length
+        self.field = field
+
+        length = 1
+        while length < degree + 1:
+            length <<= 1
+        self.domain_length = length * expansion_factor
+        self.schedule = []
+        while length * expansion_factor >= remainder_length:
+            self.schedule += [length * expansion_factor]
+            length >>= 1
+        self.num_rounds = len(self.schedule)
+        self.security_bits = num_colinearity_tests * log2(expansion_factor)
+
+        self.prover_ns = self.predict_prover(profile)
+        self.verifier_ns = self.predict_verifier(profile)
+        self.proof_bytes = self.predict_proof_size()
+
+    def predict_prover(self, profile):
+        # one coset NTT to extend the polynomial, then a Merkle tree per
+        # round and a fold of 4 multiplications per pair of points
+        n = self.domain_length
+        cost = n // 2 * log2(n) * profile.mul_ns
+        for i, length in enumerate(self.schedule):
+            cost += length * profile.leaf_hash_ns + (length - 1) * profile.node_hash_ns
+            if i < self.num_rounds - 1:
+                cost += length // 2 * 4 * profile.mul_ns
+        return cost
+
+    def predict_verifier(self, profile):
+        # per query and round three paths and a colinearity test, which
+        # interpolates a line through two points
+        cost = 0
+        for length in self.schedule[:-1]:
+            path_hashes = 2 * log2(length) + log2(length // 2)
+            cost += self.num_colinearity_tests * (
+                3 * profile.leaf_hash_ns
+                + path_hashes * profile.node_hash_ns
+                + 2 * profile.inv_ns
+                + 12 * profile.mul_ns
+            )
+        # the remainder is hashed into its root and interpolated
+        r = self.remainder_length
+        cost += r * profile.leaf_hash_ns + (r - 1) * profile.node_hash_ns
+        cost += (r // 2 * log2(r) + r) * profile.mul_ns
+        return cost
+
+    def predict_proof_size(self):
+        element_size = (self.field.p.bit_length() + 7) // 8
+        size = self.num_rounds * HASH_SIZE + self.remainder_length * element_size
+        for length in self.schedule[:-1]:
+            path_hashes = 2 * log2(length) + log2(length // 2)
+            size += self.num_colinearity_tests * (
+                3 * element_size + path_hashes * HASH_SIZE
+            )
+        return size
+
+    def cost(self, objective):
+        assert objective in OBJECTIVES, f"objective must be one of {OBJECTIVES}"
+        if objective == "prover":
+            return self.prover_ns
+        if objective == "verifier":
+            return self.verifier_ns
+        return self.proof_bytes
+
+    def fri(self, offset=None, omega=None):
+        # instantiates FRI over the coset of the plan's domain
+        field = self.field
+        offset = field.generator() if offset is None else offset
+        omega = field.primitive_nth_root(self.domain_length) if omega is None else omega
+        return FRI(
+            offset,
+            omega,
+            self.domain_length,
+            self.expansion_factor,
+            self.num_colinearity_tests,
+            self.remainder_length,
+        )
+
+    def report(self):
+        return {
+            "degree": self.degree,
+            "expansion_factor": self.expansion_factor,
+            "num_colinearity_tests": self.num_colinearity_tests,
+            "remainder_length": self.remainder_length,
+            "domain_length": self.domain_length,
+            "num_rounds": self.num_rounds,
+            "schedule": self.schedule,
+            "security_bits": self.security_bits,
+            "prover_ms": self.prover_ns / 1e6,
+            "verifier_ms": self.verifier_ns / 1e6,
+            "proof_bytes": self.proof_bytes,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"FRIPlan(expansion_factor={self.expansion_factor}, "
+            f"num_colinearity_tests={self.num_colinearity_tests}, "
+            f"remainder_length={self.remainder_length}, "
+            f"security_bits={self.security_bits}, "
+            f"prover_ms={self.prover_ns / 1e6:.1f}, "
+            f"verifier_ms={self.verifier_ns / 1e6:.1f}, proof_bytes={self.proof_bytes})"
+        )
+
+
+def candidates(
+    degree,
+    security_level,
+    field: FiniteField,
+    profile: MachineProfile,
+    expansion_factors=(2, 4, 8, 16, 32, 64),
+):
+    """
+    Returns every admissible plan, the field must be large enough for the
+    security level and the domain must fit in its two-adic subgroup.
+    """
+    assert (
+        field.p.bit_length() >= security_level
+    ), "p must have at least as many bits as security level"
+    length = 1
+    while length < degree + 1:
+        length <<= 1
+    plans = []
+    for expansion_factor in expansion_factors:
+        if not field.has_nth_root(length * expansion_factor):
+            continue
+        num_tests = -(-security_level // log2(expansion_factor))
+        remainder_length = expansion_factor
+        while remainder_length < num_tests:
+            remainder_length <<= 1
+        while remainder_length <= length * expansion_factor:
+            plans += [
+                FRIPlan(
+                    degree,
+                    expansion_factor,
+                    num_tests,
+                    remainder_length,
+                    field,
+                    profile,
+                )
+            ]
+            remainder_length <<= 1
+    return plans
+
+
+def plan(degree, security_level, field: FiniteField, profile=None, objective="prover"):
+    """
+    Returns the plan minimizing the objective, one of prover time, verifier
+    time or proof size, ties are broken by the other two in that order.
+    When no profile is given the current machine is measured.
+    """
+    assert objective in OBJECTIVES, f"objective must be one of {OBJECTIVES}"
+    profile = MachineProfile.measure(field) if profile is None else profile
+    plans = candidates(degree, security_level, field, profile)
+    assert plans != [], "no admissible FRI parameters for this field and degree"
+    order = [objective] + [o for o in OBJECTIVES if o != objective]
+    return min(plans, key=lambda p: tuple(p.cost(o) for o in order))
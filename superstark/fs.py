@@ -1,9 +1,14 @@
 """
 FS: Implementation of Fiat-Shamir Transform.
+
+Challenges are drawn from a Sampler, which reads one shake_256 output
+stream seeded with a transcript digest, so any number of indices or field
+elements costs a single hash computation.
 """
 
 from hashlib import shake_256
 import pickle
+from superstark.ff import FieldElement
 
 
 class ProofStream:
@@ -39,3 +44,56 @@ class ProofStream:
         return shake_256(pickle.dumps(self.objects[: self.read_index])).digest(
             num_bytes
         )
+
+
+class Sampler:
+    """
+    Deterministic challenge stream over shake_256(seed).
+    Integers below a bound are read as big endian words with 64 extra bits,
+    so the bias of reducing them modulo the bound is negligible.
+    """
+
+    def __init__(self, seed: bytes) -> None:
+        self.xof = shake_256(seed)
+        self.buffer = b""
+        self.position = 0
+
+    def read(self, num_bytes):
+        end = self.position + num_bytes
+        if end > len(self.buffer):
+            # squeezing restarts from the absorbed seed, growing the buffer
+            # geometrically keeps the total cost linear
+            self.buffer = self.xof.digest(max(end, 2 * len(self.buffer), 256))
+        chunk = self.buffer[self.position : end]
+        self.position = end
+        return chunk
+
+    def integers(self, number, bound):
+        width = (bound.bit_length() + 7) // 8 + 8
+        chunk = self.read(number * width)
+        return [
+            int.from_bytes(chunk[i : i + width], "big") % bound
+            for i in range(0, number * width, width)
+        ]
+
+    def indices(self, number, size, reduced_size=None):
+        """
+        Returns number indices below size whose residues modulo reduced_size
+        are pairwise distinct, rejecting repeated residues.
+        """
+        reduced_size = size if reduced_size is None else reduced_size
+        assert (
+            number <= reduced_size
+        ), "cannot sample more distinct indices than reduced size"
+        indices = []
+        seen = set()
+        while len(indices) < number:
+            for index in self.integers(number - len(indices), size):
+                reduced = index % reduced_size
+                if reduced not in seen:
+                    seen.add(reduced)
+                    indices.append(index)
+        return indices
+
+    def field_elements(self, number, field):
+        return [FieldElement(v, field) for v in self.integers(number, field.p)]
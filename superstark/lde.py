@@ -0,0 +1,119 @@
+"""
+LDE: Low degree extension of columnar execution traces.
+
+Each trace column holds the values of one register on the trace subgroup
+{trace_root^i}, it is interpolated with an inverse NTT and evaluated on the
+blown-up coset {offset * generator^i} with a forward NTT.
+Columns are independent so they are extended in parallel when workers > 1,
+the extended columns are then interleaved into a row-major matrix whose rows
+are the leafs of the trace commitment.
+    offset : the coset offset, usually a generator of the multiplicative group.
+    generator : a primitive root of unity of order length.
+    length : the size of the extended domain, a multiple of the trace length.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from superstark.ff import FieldElement
+from superstark.merkle import MerkleTree
+from superstark.ntt import _ntt, _intt
+
+
+def extend_column(values, trace_root, offset, generator, length, p):
+    # coefficients over the trace subgroup, scaled by offset^i so that the
+    # transform over the generator's subgroup evaluates on the coset
+    coefficients = _intt(values, trace_root, p)
+    power = 1
+    for i in range(len(coefficients)):
+        coefficients[i] = coefficients[i] * power % p
+        power = power * offset % p
+    coefficients += [0] * (length - len(coefficients))
+    return _ntt(coefficients, generator, p)
+
+
+class LDE:
+    def __init__(self, offset, generator, length, trace_length, workers=1) -> None:
+        assert (
+            trace_length & (trace_length - 1) == 0
+        ), "trace length must be a power of two"
+        assert (
+            length % trace_length == 0
+        ), "extended length must be a multiple of the trace length"
+        self.field = offset.field
+        self.offset = offset
+        self.generator = generator
+        self.length = length
+        self.trace_length = trace_length
+        self.trace_root = generator ^ (length // trace_length)
+        self.workers = workers
+
+    def extend(self, columns):
+        """
+        Returns the extended columns as lists of integers, columns may be
+        given as field elements or integers.
+        """
+        p = self.field.p
+        columns = [
+            [v.value if isinstance(v, FieldElement) else v % p for v in column]
+            for column in columns
+        ]
+        assert all(
+            len(column) == self.trace_length for column in columns
+        ), "trace columns must have trace_length rows"
+        args = (
+            self.trace_root.value,
+            self.offset.value,
+            self.generator.value,
+            self.length,
+            p,
+        )
+        if self.workers <= 1 or len(columns) <= 1:
+            return [extend_column(column, *args) for column in columns]
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(columns))) as pool:
+            futures = [pool.submit(extend_column, column, *args) for column in columns]
+            return [future.result() for future in futures]
+
+    def matrix(self, columns):
+        return TraceMatrix(self.extend(columns), self.field)
+
+
+class TraceMatrix:
+    """
+    Row-major matrix of the extended trace, row i holds the value of every
+    register at offset * generator^i.
+    Rows are packed as fixed width big endian integers so a row is a single
+    Merkle leaf.
+    """
+
+    def __init__(self, columns, field) -> None:
+        self.field = field
+        self.width = len(columns)
+        self.height = len(columns[0]) if columns else 0
+        self.values = [0] * (self.width * self.height)
+        for j, column in enumerate(columns):
+            self.values[j :: self.width] = column
+        self.element_size = (field.p.bit_length() + 7) // 8
+
+    def __len__(self):
+        return self.height
+
+    def row(self, index):
+        start = index * self.width
+        return [
+            FieldElement(v, self.field) for v in self.values[start : start + self.width]
+        ]
+
+    def column(self, index):
+        return self.values[index :: self.width]
+
+    def leaf(self, index):
+        start = index * self.width
+        size = self.element_size
+        return b"".join(
+            v.to_bytes(size, "big") for v in self.values[start : start + self.width]
+        )
+
+    def leafs(self):
+        return [self.leaf(i) for i in range(self.height)]
+
+    def tree(self):
+        return MerkleTree(self.leafs())
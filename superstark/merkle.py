@@ -1,8 +1,10 @@
 """
 Merkle: Implementation of Merkle Trees over Blake2
 """
+
 from typing import List, Any
 from hashlib import blake2b
+from superstark.ff import FieldElement
 
 
 class Merkle:
@@ -56,13 +58,179 @@ class Merkle:
                     root, index >> 1, path[1:], Merkle.H(path[0] + leaf).digest()
                 )
 
+    def tree_(nodes):
+        # all layers of the tree bottom-up, the last layer holds the root
+        assert len(nodes) & (len(nodes) - 1) == 0, "List must be of a power two length"
+        layers = [nodes]
+        while len(nodes) > 1:
+            nodes = [
+                Merkle.H(nodes[i] + nodes[i + 1]).digest()
+                for i in range(0, len(nodes), 2)
+            ]
+            layers += [nodes]
+        return layers
+
+    def open_tree_(index, layers):
+        # same path as open_ read off precomputed layers
+        assert 0 <= index and index < len(layers[0])
+        return [layers[d][(index >> d) ^ 1] for d in range(len(layers) - 1)]
+
     # The following functions expose the API and compute hashes of leafs before
     # calling the underlying code.
     def commit(leafs: List[Any]):
-        return Merkle.commit_([Merkle.H(bytes(leaf)).digest() for leaf in leafs])
+        return Merkle.tree(leafs)[-1][0]
 
     def open(index: int, leafs: List[Any]):
-        return Merkle.open_(index, [Merkle.H(bytes(leaf)).digest() for leaf in leafs])
+        return Merkle.open_tree_(index, Merkle.tree(leafs))
+
+    def tree(leafs):
+        return Merkle.tree_([Merkle.H(bytes(leaf)).digest() for leaf in leafs])
 
     def verify(root: bytes, index: int, path: List[List[Any]], leaf: List[Any]):
         return Merkle.verify_(root, index, path, Merkle.H(bytes(leaf)).digest())
+
+
+class MerkleTree:
+    """
+    A committed list kept together with its tree so that openings are read
+    off the layers instead of rehashing the list.
+    """
+
+    def __init__(self, leafs: List[Any], layers=None) -> None:
+        self.leafs = leafs
+        self.layers = Merkle.tree(leafs) if layers is None else layers
+
+    def __len__(self):
+        return len(self.leafs)
+
+    def root(self):
+        return self.layers[-1][0]
+
+    def leaf(self, index):
+        return self.leafs[index]
+
+    def open(self, index):
+        return Merkle.open_tree_(index, self.layers)
+
+
+class SpilledMerkleTree:
+    """
+    A committed codeword of field elements whose values are written to a
+    file as fixed width integers, only the tree above the leaf hashes stays
+    in memory.
+    Leafs are read back from the file when opened and the sibling leaf hash
+    is recomputed.
+    """
+
+    def __init__(self, values: List[int], field, spill) -> None:
+        self.field = field
+        self.spill = spill
+        self.length = len(values)
+        self.width = (field.p.bit_length() + 7) // 8
+        layers = Merkle.tree(FieldElement(v, field) for v in values)
+        self.root_ = layers[-1][0]
+        self.layers = layers[1:]
+        self.offset = spill.seek(0, 2)
+        spill.write(b"".join(v.to_bytes(self.width, "big") for v in values))
+
+    def __len__(self):
+        return self.length
+
+    def root(self):
+        return self.root_
+
+    def leaf(self, index):
+        assert 0 <= index and index < self.length
+        self.spill.seek(self.offset + index * self.width)
+        return FieldElement(
+            int.from_bytes(self.spill.read(self.width), "big"), self.field
+        )
+
+    def open(self, index):
+        sibling = Merkle.H(bytes(self.leaf(index ^ 1))).digest()
+        return [sibling] + Merkle.open_tree_(index >> 1, self.layers)
+
+
+class IncrementalMerkle:
+    """
+    A Merkle tree over a growing list of leafs.
+    The tree has a power of two capacity, positions past the last leaf hold
+    the padding leaf b"", so the root equals Merkle.commit of the leafs
+    padded with b"" to the capacity and paths verify with Merkle.verify.
+    The capacity is at least two so that every path holds a sibling.
+    Updates rehash each shared ancestor once, appends past the capacity
+    double it with precomputed hashes of all padding subtrees.
+    """
+
+    PAD = b""
+
+    def __init__(self, leafs=()) -> None:
+        self.leafs = []
+        # pads[d] is the root of a subtree of height d holding only padding
+        self.pads = [Merkle.H(bytes(IncrementalMerkle.PAD)).digest()]
+        self.layers = [[self.pads[0]]]
+        self.grow()
+        self.append(leafs)
+
+    def __len__(self):
+        return len(self.leafs)
+
+    def capacity(self):
+        return len(self.layers[0])
+
+    def root(self):
+        return self.layers[-1][0]
+
+    def leaf(self, index):
+        return self.leafs[index]
+
+    def open(self, index):
+        assert 0 <= index and index < len(
+            self.leafs
+        ), "cannot open index past the last leaf"
+        return Merkle.open_tree_(index, self.layers)
+
+    def grow(self):
+        # the current tree becomes the left half of a tree twice as large
+        pads = self.pads
+        pads += [Merkle.H(pads[-1] + pads[-1]).digest()]
+        for d, layer in enumerate(self.layers):
+            layer += [pads[d]] * len(layer)
+        top = self.layers[-1]
+        self.layers += [[Merkle.H(top[0] + top[1]).digest()]]
+
+    def update_(self, positions):
+        # recomputes every ancestor of the given leaf positions once
+        for d in range(1, len(self.layers)):
+            below = self.layers[d - 1]
+            layer = self.layers[d]
+            positions = set(i >> 1 for i in positions)
+            for i in positions:
+                layer[i] = Merkle.H(below[2 * i] + below[2 * i + 1]).digest()
+
+    def update(self, index, leaf):
+        self.update_batch([(index, leaf)])
+
+    def update_batch(self, updates):
+        # the whole batch is checked before the tree is touched
+        updates = list(updates)
+        for index, leaf in updates:
+            assert 0 <= index and index < len(
+                self.leafs
+            ), "cannot update index past the last leaf"
+        for index, leaf in updates:
+            self.leafs[index] = leaf
+            self.layers[0][index] = Merkle.H(bytes(leaf)).digest()
+        self.update_([index for index, leaf in updates])
+
+    def append(self, leafs):
+        leafs = list(leafs)
+        if len(leafs) == 0:
+            return
+        start = len(self.leafs)
+        while start + len(leafs) > self.capacity():
+            self.grow()
+        self.leafs += leafs
+        for i, leaf in enumerate(leafs):
+            self.layers[0][start + i] = Merkle.H(bytes(leaf)).digest()
+        self.update_(range(start, start + len(leafs)))
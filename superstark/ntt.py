@@ -0,0 +1,154 @@
+"""
+NTT: Number Theoretic Transforms and the fast polynomial arithmetic built on them.
+
+Transforms run iteratively on raw integers and only wrap results into
+field elements at the boundary. Transforms, multiplication and coset
+evaluation and interpolation take O(n log n) operations, fast_zerofier
+multiplies up a product tree in O(n log^2 n).
+    primitive_root : a primitive root of unity of order root_order.
+    root_order : a power of two at least as large as the transform size.
+"""
+
+from superstark.ff import FieldElement
+from superstark.poly import Univariate
+from superstark.domain import lookup
+
+
+def _ntt(values, root, p):
+    # iterative Cooley-Tukey over integers with twiddles and the bit-reversal
+    # permutation taken from the shared domain cache
+    n = len(values)
+    domain = lookup(p, 1, root, n)
+    twiddles = domain.twiddles()
+    a = [values[r] for r in domain.bit_reversal()]
+    length = 2
+    while length <= n:
+        half = length // 2
+        stride = n // length
+        for start in range(0, n, length):
+            for k in range(half):
+                u = a[start + k]
+                v = a[start + k + half] * twiddles[k * stride] % p
+                a[start + k] = (u + v) % p
+                a[start + k + half] = (u - v) % p
+        length <<= 1
+    return a
+
+
+def _intt(values, root, p):
+    n = len(values)
+    ninv = pow(n, -1, p)
+    return [v * ninv % p for v in _ntt(values, pow(root, -1, p), p)]
+
+
+def ntt(primitive_root, values):
+    assert (
+        len(values) & (len(values) - 1) == 0
+    ), "cannot compute ntt of non-power-of-two sequence"
+    if len(values) <= 1:
+        return values
+    field = values[0].field
+    assert (
+        primitive_root ^ len(values) == field.one()
+    ), "primitive root must be nth root of unity, where n is len(values)"
+    assert (
+        primitive_root ^ (len(values) // 2) != field.one()
+    ), "primitive root is not primitive nth root of unity, where n is len(values)"
+    p = field.p
+    return [
+        FieldElement(v, field)
+        for v in _ntt([x.value for x in values], primitive_root.value, p)
+    ]
+
+
+def intt(primitive_root, values):
+    assert (
+        len(values) & (len(values) - 1) == 0
+    ), "cannot compute intt of non-power-of-two sequence"
+    if len(values) <= 1:
+        return values
+    field = values[0].field
+    return [
+        FieldElement(v, field)
+        for v in _intt([x.value for x in values], primitive_root.value, field.p)
+    ]
+
+
+def fast_multiply(lhs, rhs, primitive_root, root_order):
+    assert (
+        primitive_root ^ root_order == primitive_root.field.one()
+    ), "supplied root does not have supplied order"
+    assert (
+        primitive_root ^ (root_order // 2) != primitive_root.field.one()
+    ), "supplied root is not primitive root of supplied order"
+
+    if lhs.is_zero() or rhs.is_zero():
+        return Univariate([])
+
+    field = lhs.coefficients[0].field
+    p = field.p
+    degree = lhs.degree() + rhs.degree()
+    if degree < 8:
+        return lhs * rhs
+
+    order = 1
+    while order <= degree:
+        order <<= 1
+    assert order <= root_order, "product degree exceeds the supplied root order"
+    root = pow(primitive_root.value, root_order // order, p)
+
+    lhs_values = [c.value for c in lhs.coefficients[: lhs.degree() + 1]]
+    rhs_values = [c.value for c in rhs.coefficients[: rhs.degree() + 1]]
+    lhs_codeword = _ntt(lhs_values + [0] * (order - len(lhs_values)), root, p)
+    rhs_codeword = _ntt(rhs_values + [0] * (order - len(rhs_values)), root, p)
+    product = _intt([l * r % p for l, r in zip(lhs_codeword, rhs_codeword)], root, p)
+    return Univariate([FieldElement(v, field) for v in product[: degree + 1]])
+
+
+def fast_zerofier(domain, primitive_root, root_order):
+    assert (
+        primitive_root ^ root_order == primitive_root.field.one()
+    ), "supplied root does not have supplied order"
+    assert (
+        primitive_root ^ (root_order // 2) != primitive_root.field.one()
+    ), "supplied root is not primitive root of supplied order"
+
+    if len(domain) == 0:
+        return Univariate([])
+
+    if len(domain) == 1:
+        return Univariate([-domain[0], primitive_root.field.one()])
+
+    half = len(domain) // 2
+    left = fast_zerofier(domain[:half], primitive_root, root_order)
+    right = fast_zerofier(domain[half:], primitive_root, root_order)
+    return fast_multiply(left, right, primitive_root, root_order)
+
+
+def fast_coset_evaluate(polynomial, offset, generator, order):
+    # evaluates the polynomial on {offset * generator^i} for i < order
+    field = offset.field
+    p = field.p
+    coefficients = [c.value for c in polynomial.coefficients]
+    assert len(coefficients) <= order, "polynomial degree exceeds the coset size"
+    scaled = []
+    power = 1
+    for c in coefficients:
+        scaled += [c * power % p]
+        power = power * offset.value % p
+    scaled += [0] * (order - len(scaled))
+    return [FieldElement(v, field) for v in _ntt(scaled, generator.value, p)]
+
+
+def fast_coset_interpolate(values, offset, generator):
+    # inverse of fast_coset_evaluate, returns the unique polynomial of degree
+    # less than len(values) taking the given values on the coset
+    field = offset.field
+    p = field.p
+    coefficients = _intt([v.value for v in values], generator.value, p)
+    offset_inv = pow(offset.value, -1, p)
+    power = 1
+    for i in range(len(coefficients)):
+        coefficients[i] = coefficients[i] * power % p
+        power = power * offset_inv % p
+    return Univariate([FieldElement(c, field) for c in coefficients])
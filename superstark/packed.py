@@ -0,0 +1,464 @@
+"""
+Packed: Polynomial backends over raw integer coefficients.
+
+PackedMultivariate stores a dictionary from packed exponent vectors to
+residues, every variable owns a fixed bit-field of the packed integer so
+multiplying monomials is adding their keys.
+
+PackedUnivariate stores a dense list of integers modulo p with trailing zeros
+stripped, so the degree is known without scanning, SparseUnivariate stores
+only the non zero terms which suits zerofiers and binomials such as x^n - c.
+Both mirror the Univariate API (degree, evaluate, divide, ...) and expose
+coefficients as field elements so they can be passed where a Univariate is
+expected, operands of either backend or Univariate mix freely.
+"""
+
+from superstark.ff import FieldElement, FiniteField
+from superstark.poly import Univariate, Multivariate
+from superstark.ntt import _ntt, _intt
+
+# below this many coefficients per operand schoolbook multiplication wins
+NTT_THRESHOLD = 64
+# bits per variable in a packed exponent, the top bit of every field is a
+# guard bit so exponents stay below 2^(EXPONENT_BITS - 1)
+EXPONENT_BITS = 16
+
+
+def _terms(polynomial):
+    # non zero (exponent, value) pairs of any backend
+    if isinstance(polynomial, SparseUnivariate):
+        return sorted(polynomial.terms.items())
+    return [(i, v) for i, v in enumerate(polynomial.values) if v != 0]
+
+
+def _divide(numerator, denominator_terms, p):
+    # long division of a dense integer list by a polynomial given by its non
+    # zero terms, each step only touches the divisor's terms
+    degree, lead = denominator_terms[-1]
+    lead_inv = pow(lead, -1, p)
+    remainder = [v for v in numerator]
+    if len(remainder) - 1 < degree:
+        return [], remainder
+    quotient = [0] * (len(remainder) - degree)
+    lower = denominator_terms[:-1]
+    for shift in reversed(range(len(quotient))):
+        coefficient = remainder[shift + degree] % p * lead_inv % p
+        quotient[shift] = coefficient
+        remainder[shift + degree] = 0
+        if coefficient == 0:
+            continue
+        for e, c in lower:
+            remainder[shift + e] -= coefficient * c
+    return quotient, [v % p for v in remainder[:degree]]
+
+
+class PackedUnivariate:
+    __slots__ = ("values", "field")
+
+    def __init__(self, values, field: FiniteField):
+        p = field.p
+        values = [v % p for v in values]
+        while values and values[-1] == 0:
+            values.pop()
+        self.values = values
+        self.field = field
+
+    def from_univariate(polynomial, field=None):
+        if isinstance(polynomial, PackedUnivariate):
+            return polynomial
+        if isinstance(polynomial, SparseUnivariate):
+            return polynomial.to_dense()
+        if field is None:
+            assert (
+                polynomial.coefficients != []
+            ), "cannot infer field of empty polynomial"
+            field = polynomial.coefficients[0].field
+        return PackedUnivariate([c.value for c in polynomial.coefficients], field)
+
+    def to_univariate(self):
+        return Univariate(self.coefficients)
+
+    def lift(self, other):
+        # coerces any polynomial backend, field element or integer
+        if isinstance(other, PackedUnivariate):
+            return other
+        if isinstance(other, FieldElement):
+            return PackedUnivariate([other.value], self.field)
+        if type(other) is int:
+            return PackedUnivariate([other], self.field)
+        return PackedUnivariate.from_univariate(other, self.field)
+
+    @property
+    def coefficients(self):
+        return [FieldElement(v, self.field) for v in self.values]
+
+    def degree(self):
+        return len(self.values) - 1
+
+    def is_zero(self):
+        return len(self.values) == 0
+
+    def leading_coefficient(self):
+        return FieldElement(self.values[-1], self.field)
+
+    def __neg__(self):
+        return PackedUnivariate([-v for v in self.values], self.field)
+
+    def __add__(self, other):
+        other = self.lift(other)
+        lhs, rhs = self.values, other.values
+        if len(lhs) < len(rhs):
+            lhs, rhs = rhs, lhs
+        values = [v for v in lhs]
+        for i, v in enumerate(rhs):
+            values[i] += v
+        return PackedUnivariate(values, self.field)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self.__add__(-self.lift(other))
+
+    def __rsub__(self, other):
+        return self.lift(other).__add__(-self)
+
+    def __mul__(self, other):
+        if isinstance(other, SparseUnivariate):
+            return other.__mul__(self)
+        other = self.lift(other)
+        lhs, rhs = self.values, other.values
+        if len(lhs) == 0 or len(rhs) == 0:
+            return PackedUnivariate([], self.field)
+        p = self.field.p
+        length = len(lhs) + len(rhs) - 1
+        order = 1
+        while order < length:
+            order <<= 1
+        if min(len(lhs), len(rhs)) >= NTT_THRESHOLD and self.field.has_nth_root(order):
+            root = self.field.primitive_nth_root(order).value
+            lhs_codeword = _ntt(lhs + [0] * (order - len(lhs)), root, p)
+            rhs_codeword = _ntt(rhs + [0] * (order - len(rhs)), root, p)
+            product = _intt(
+                [l * r % p for l, r in zip(lhs_codeword, rhs_codeword)], root, p
+            )
+            return PackedUnivariate(product[:length], self.field)
+        buf = [0] * length
+        for i, a in enumerate(lhs):
+            if a == 0:
+                continue
+            for j, b in enumerate(rhs):
+                buf[i + j] += a * b
+        return PackedUnivariate(buf, self.field)
+
+    __rmul__ = __mul__
+
+    def divide(numerator, denominator):
+        denominator = numerator.lift(denominator)
+        if denominator.is_zero():
+            return None
+        quotient, remainder = _divide(
+            numerator.values, _terms(denominator), numerator.field.p
+        )
+        return (
+            PackedUnivariate(quotient, numerator.field),
+            PackedUnivariate(remainder, numerator.field),
+        )
+
+    def __truediv__(self, other):
+        quo, rem = PackedUnivariate.divide(self, other)
+        assert (
+            rem.is_zero()
+        ), "cannot perform polynomial division because remainder is not zero"
+        return quo
+
+    def __mod__(self, other):
+        quo, rem = PackedUnivariate.divide(self, other)
+        return rem
+
+    def __xor__(self, exponent):
+        if self.is_zero():
+            return PackedUnivariate([], self.field)
+        acc = PackedUnivariate([1], self.field)
+        for b in bin(exponent)[2:]:
+            acc = acc * acc
+            if b == "1":
+                acc = acc * self
+        return acc
+
+    def __eq__(self, other):
+        return self.values == self.lift(other).values
+
+    def __neq__(self, other):
+        return not self.__eq__(other)
+
+    def evaluate(self, point):
+        p = self.field.p
+        x = point.value
+        acc = 0
+        for c in reversed(self.values):
+            acc = (acc * x + c) % p
+        return FieldElement(acc, self.field)
+
+    def evaluate_domain(self, domain):
+        return [self.evaluate(d) for d in domain]
+
+    def scale(self, factor):
+        p = self.field.p
+        values = [0] * len(self.values)
+        power = 1
+        for i, v in enumerate(self.values):
+            values[i] = v * power
+            power = power * factor.value % p
+        return PackedUnivariate(values, self.field)
+
+
+class SparseUnivariate:
+    __slots__ = ("terms", "field")
+
+    def __init__(self, terms, field: FiniteField):
+        p = field.p
+        self.terms = {e: v % p for e, v in terms.items() if v % p != 0}
+        self.field = field
+
+    def binomial(n, c, field):
+        # x^n - c, the zerofier of the n-th roots of c
+        value = c.value if isinstance(c, FieldElement) else c
+        return (
+            SparseUnivariate({n: 1, 0: -value}, field)
+            if n > 0
+            else SparseUnivariate({0: 1 - value}, field)
+        )
+
+    def to_dense(self):
+        values = [0] * (self.degree() + 1)
+        for e, v in self.terms.items():
+            values[e] = v
+        return PackedUnivariate(values, self.field)
+
+    def to_univariate(self):
+        return self.to_dense().to_univariate()
+
+    @property
+    def coefficients(self):
+        return self.to_dense().coefficients
+
+    def degree(self):
+        return max(self.terms.keys()) if self.terms else -1
+
+    def is_zero(self):
+        return len(self.terms) == 0
+
+    def leading_coefficient(self):
+        return FieldElement(self.terms[self.degree()], self.field)
+
+    def __neg__(self):
+        return SparseUnivariate({e: -v for e, v in self.terms.items()}, self.field)
+
+    def __add__(self, other):
+        if not isinstance(other, SparseUnivariate):
+            return self.to_dense() + other
+        terms = dict(self.terms)
+        for e, v in other.terms.items():
+            terms[e] = terms.get(e, 0) + v
+        return SparseUnivariate(terms, self.field)
+
+    def __sub__(self, other):
+        return self.__add__(-other)
+
+    def __mul__(self, other):
+        if isinstance(other, SparseUnivariate):
+            terms = dict()
+            for e0, v0 in self.terms.items():
+                for e1, v1 in other.terms.items():
+                    terms[e0 + e1] = terms.get(e0 + e1, 0) + v0 * v1
+            return SparseUnivariate(terms, self.field)
+        other = PackedUnivariate.lift(self.to_dense(), other)
+        if other.is_zero() or self.is_zero():
+            return PackedUnivariate([], self.field)
+        # shift-and-add, one pass over the dense operand per term
+        buf = [0] * (self.degree() + len(other.values))
+        for e, v in self.terms.items():
+            for i, c in enumerate(other.values):
+                buf[e + i] += v * c
+        return PackedUnivariate(buf, self.field)
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other):
+        return self.to_dense() == other
+
+    def evaluate(self, point):
+        p = self.field.p
+        x = point.value
+        acc = 0
+        for e, v in self.terms.items():
+            acc += v * pow(x, e, p)
+        return FieldElement(acc % p, self.field)
+
+    def evaluate_domain(self, domain):
+        return [self.evaluate(d) for d in domain]
+
+
+def pack_exponents(exponents, bits=EXPONENT_BITS):
+    packed = 0
+    for i, e in enumerate(exponents):
+        assert 0 <= e < 1 << (bits - 1), "exponent does not fit its bit-field"
+        packed |= e << (bits * i)
+    return packed
+
+
+def unpack_exponents(packed, num_variables, bits=EXPONENT_BITS):
+    mask = (1 << bits) - 1
+    return tuple((packed >> (bits * i)) & mask for i in range(num_variables))
+
+
+def guard_mask(num_variables, bits=EXPONENT_BITS):
+    # the top bit of every variable's field, set only by an overflowing sum
+    return sum(1 << (bits * i + bits - 1) for i in range(num_variables))
+
+
+class PackedMultivariate:
+    __slots__ = ("terms", "num_variables", "field", "bits")
+
+    def __init__(self, terms, num_variables, field: FiniteField, bits=EXPONENT_BITS):
+        # terms maps packed exponents to residues, zero terms are dropped
+        p = field.p
+        self.terms = {k: v % p for k, v in terms.items() if v % p != 0}
+        self.num_variables = num_variables
+        self.field = field
+        self.bits = bits
+
+    def from_multivariate(polynomial, field=None, bits=EXPONENT_BITS):
+        if field is None:
+            assert polynomial.dictionary != {}, "cannot infer field of empty polynomial"
+            field = list(polynomial.dictionary.values())[0].field
+        num_variables = max([len(k) for k in polynomial.dictionary.keys()] + [1])
+        terms = dict()
+        for k, v in polynomial.dictionary.items():
+            key = pack_exponents(k, bits)
+            terms[key] = terms.get(key, 0) + v.value
+        return PackedMultivariate(terms, num_variables, field, bits)
+
+    def to_multivariate(self):
+        return Multivariate(
+            {
+                unpack_exponents(k, self.num_variables, self.bits): FieldElement(
+                    v, self.field
+                )
+                for k, v in self.terms.items()
+            }
+        )
+
+    def variables(num_variables, field, bits=EXPONENT_BITS):
+        return [
+            PackedMultivariate({1 << (bits * i): 1}, num_variables, field, bits)
+            for i in range(num_variables)
+        ]
+
+    def constant(element, num_variables, field, bits=EXPONENT_BITS):
+        value = element.value if isinstance(element, FieldElement) else element
+        return PackedMultivariate({0: value}, num_variables, field, bits)
+
+    def lift(polynomial, variable_index, num_variables=None, bits=EXPONENT_BITS):
+        # coefficient i lands on the monomial x_variable_index^i directly
+        num_variables = variable_index + 1 if num_variables is None else num_variables
+        packed = PackedUnivariate.from_univariate(polynomial)
+        shift = bits * variable_index
+        assert len(packed.values) <= 1 << (
+            bits - 1
+        ), "degree does not fit its bit-field"
+        return PackedMultivariate(
+            {i << shift: v for i, v in enumerate(packed.values)},
+            num_variables,
+            packed.field,
+            bits,
+        )
+
+    def coerce(self, other):
+        if isinstance(other, PackedMultivariate):
+            assert other.bits == self.bits, "cannot mix exponent packings"
+            return other
+        if isinstance(other, Multivariate):
+            return PackedMultivariate.from_multivariate(other, self.field, self.bits)
+        value = other.value if isinstance(other, FieldElement) else other
+        return PackedMultivariate({0: value}, self.num_variables, self.field, self.bits)
+
+    def is_zero(self):
+        return len(self.terms) == 0
+
+    def degree(self):
+        if self.is_zero():
+            return -1
+        return max(
+            sum(unpack_exponents(k, self.num_variables, self.bits)) for k in self.terms
+        )
+
+    def __neg__(self):
+        return PackedMultivariate(
+            {k: -v for k, v in self.terms.items()},
+            self.num_variables,
+            self.field,
+            self.bits,
+        )
+
+    def __add__(self, other):
+        other = self.coerce(other)
+        terms = dict(self.terms)
+        for k, v in other.terms.items():
+            terms[k] = terms.get(k, 0) + v
+        return PackedMultivariate(
+            terms, max(self.num_variables, other.num_variables), self.field, self.bits
+        )
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self.__add__(-self.coerce(other))
+
+    def __rsub__(self, other):
+        return self.coerce(other).__add__(-self)
+
+    def __mul__(self, other):
+        other = self.coerce(other)
+        num_variables = max(self.num_variables, other.num_variables)
+        guard = guard_mask(num_variables, self.bits)
+        terms = dict()
+        get = terms.get
+        for k0, v0 in self.terms.items():
+            for k1, v1 in other.terms.items():
+                k = k0 + k1
+                terms[k] = get(k, 0) + v0 * v1
+        keys = 0
+        for k in terms:
+            keys |= k
+        assert keys & guard == 0, "exponent overflow, use more bits per variable"
+        return PackedMultivariate(terms, num_variables, self.field, self.bits)
+
+    __rmul__ = __mul__
+
+    def __xor__(self, exponent):
+        acc = PackedMultivariate({0: 1}, self.num_variables, self.field, self.bits)
+        for b in bin(exponent)[2:]:
+            acc = acc * acc
+            if b == "1":
+                acc = acc * self
+        return acc
+
+    def __eq__(self, other):
+        return self.terms == self.coerce(other).terms
+
+    def evaluate(self, point):
+        p = self.field.p
+        values = [x.value for x in point]
+        powers = dict()
+        acc = 0
+        for k, v in self.terms.items():
+            prod = v
+            for i, e in enumerate(unpack_exponents(k, self.num_variables, self.bits)):
+                if e == 0:
+                    continue
+                if (i, e) not in powers:
+                    powers[(i, e)] = pow(values[i], e, p)
+                prod = prod * powers[(i, e)] % p
+            acc += prod
+        return FieldElement(acc % p, self.field)
@@ -3,6 +3,7 @@ Poly: Implementation of Univariate and Multivariate Polynomials on Finite Fields
 """
 
 from typing import List
+from itertools import repeat
 from superstark.ff import FieldElement
 
 
@@ -11,16 +12,11 @@ class Univariate:
         self.coefficients: List[FieldElement] = [c for c in coefficients]
 
     def degree(self):
-        if self.coefficients == []:
-            return -1
-        zero = self.coefficients[0].field.zero()
-        if self.coefficients == [zero] * len(self.coefficients):
-            return -1
-        maxindex = 0
-        for i in range(len(self.coefficients)):
-            if self.coefficients[i] != zero:
-                maxindex = i
-        return maxindex
+        # scan from the top, only trailing zeros are visited
+        for i in reversed(range(len(self.coefficients))):
+            if self.coefficients[i].value != 0:
+                return i
+        return -1
 
     def __neg__(self):
         return Univariate([-c for c in self.coefficients])
@@ -44,14 +40,18 @@ class Univariate:
     def __mul__(self, other):
         if self.coefficients == [] or other.coefficients == []:
             return Univariate([])
-        zero = self.coefficients[0].field.zero()
-        buf = [zero] * (len(self.coefficients) + len(other.coefficients) - 1)
+        field = self.coefficients[0].field
+        # products are accumulated unreduced and reduced once per coefficient
+        rhs = [c.value for c in other.coefficients]
+        buf = [0] * (len(self.coefficients) + len(rhs) - 1)
         for i in range(len(self.coefficients)):
-            if self.coefficients[i].is_zero():
+            a = self.coefficients[i].value
+            if a == 0:
                 continue  # optimization for sparse polynomials
-            for j in range(len(other.coefficients)):
-                buf[i + j] = buf[i + j] + self.coefficients[i] * other.coefficients[j]
-        return Univariate(buf)
+            for j in range(len(rhs)):
+                buf[i + j] += a * rhs[j]
+        p = field.p
+        return Univariate([FieldElement(c % p, field) for c in buf])
 
     def __eq__(self, other):
         if self.degree() != other.degree():
@@ -60,7 +60,7 @@ class Univariate:
             return True
         return all(
             self.coefficients[i] == other.coefficients[i]
-            for i in range(len(self.coefficients))
+            for i in range(self.degree() + 1)
         )
 
     def __neq__(self, other):
@@ -123,12 +123,7 @@ class Univariate:
         return acc
 
     def evaluate(self, point):
-        xi = point.field.one()
-        value = point.field.zero()
-        for c in self.coefficients:
-            value = value + c * xi
-            xi = xi * point
-        return value
+        return point.field.horner(self.coefficients, point)
 
     def evaluate_domain(self, domain):
         return [self.evaluate(d) for d in domain]
@@ -277,15 +272,86 @@ class Multivariate:
         return acc
 
     def evaluate(self, point):
-        acc = point[0].field.zero()
+        field = point[0].field
+        p = field.p
+        # monomial values are summed unreduced, powers are shared across
+        # monomials
+        powers = dict()
+        acc = field.accumulator()
         for k, v in self.dictionary.items():
-            prod = v
+            prod = v.value
             for i in range(len(k)):
-                prod = prod * (point[i] ^ k[i])
-            acc = acc + prod
-        return acc
+                if k[i] == 0:
+                    continue
+                if (i, k[i]) not in powers:
+                    powers[(i, k[i])] = pow(point[i].value, k[i], p)
+                prod = prod * powers[(i, k[i])] % p
+            acc.add(prod)
+        return acc.value()
+
+    # compile turns a polynomial or a list of polynomials into an evaluation
+    # plan that is reused across many points, see CompiledMultivariate.
+    def compile(polynomials, field=None):
+        if isinstance(polynomials, Multivariate):
+            polynomials = [polynomials]
+        return CompiledMultivariate(polynomials, field)
 
     def evaluate_symbolic(self, point):
+        """
+        Substitutes univariate polynomials for the variables.
+        Every univariate is evaluated on a power-of-two coset large enough
+        for the composed degree, the monomials are combined pointwise with a
+        compiled plan that shares powers across monomials, and the result is
+        recovered with a single inverse transform.
+        """
+        # ntt depends on this module so it can only be imported lazily
+        from superstark.ntt import fast_coset_evaluate, fast_coset_interpolate
+
+        if self.is_zero():
+            return Univariate([])
+        field = list(self.dictionary.values())[0].field
+        degrees = [max(p.degree(), 0) for p in point]
+        bound = max(
+            sum(e * d for e, d in zip(k, degrees)) for k in self.dictionary.keys()
+        )
+        order = 1
+        while order <= bound:
+            order <<= 1
+        if order < 8 or not field.has_nth_root(order):
+            return self._evaluate_symbolic_naive(point)
+        root = field.primitive_nth_root(order)
+        offset = field.generator()
+
+        num_variables = max(len(k) for k in self.dictionary.keys())
+        read = [
+            any(i < len(k) and k[i] != 0 for k in self.dictionary.keys())
+            for i in range(num_variables)
+        ]
+        # a variable the plan reads has degree below order once its trailing
+        # zero coefficients are dropped, the others get a dummy column
+        columns = [
+            (
+                [
+                    v.value
+                    for v in fast_coset_evaluate(
+                        Univariate(point[i].coefficients[: degrees[i] + 1]),
+                        offset,
+                        root,
+                        order,
+                    )
+                ]
+                if read[i]
+                else [0] * order
+            )
+            for i in range(num_variables)
+        ]
+        values = Multivariate.compile(self, field).evaluate_columns(columns)[0]
+        polynomial = fast_coset_interpolate(
+            [FieldElement(v, field) for v in values], offset, root
+        )
+        return Univariate(polynomial.coefficients[: bound + 1])
+
+    def _evaluate_symbolic_naive(self, point):
         acc = Univariate([])
         for k, v in self.dictionary.items():
             prod = Univariate([v])
@@ -293,3 +359,158 @@ class Multivariate:
                 prod = prod * (point[i] ^ k[i])
             acc = acc + prod
         return acc
+
+
+class CompiledMultivariate:
+    """
+    An evaluation plan for a list of multivariate polynomials.
+
+    Every polynomial is rewritten in nested Horner form, variables with the
+    fewest distinct exponents outermost, and lowered to a straight-line
+    program of multiply and multiply-add instructions.
+    Powers of variables are shared through a common power table and
+    identical instructions are emitted once, so subexpressions common to
+    several monomials or several polynomials are evaluated once.
+    The program runs on columns of raw integers, one column per variable,
+    and evaluates every row in a single pass.
+    """
+
+    def __init__(self, polynomials, field=None):
+        for polynomial in polynomials:
+            for v in polynomial.dictionary.values():
+                field = v.field
+                break
+        assert field is not None, "cannot infer field from zero polynomials"
+        self.field = field
+        self.num_variables = max(
+            [len(k) for polynomial in polynomials for k in polynomial.dictionary.keys()]
+            + [0]
+        )
+
+        # operands are ("r", register) or ("c", constant)
+        self.program = []
+        self.memo = dict()
+        self.powers = dict()
+        self.num_registers = self.num_variables
+
+        p = field.p
+        terms = []
+        for polynomial in polynomials:
+            reduced = dict()
+            for k, v in polynomial.dictionary.items():
+                exponent = tuple(k) + (0,) * (self.num_variables - len(k))
+                reduced[exponent] = (reduced.get(exponent, 0) + v.value) % p
+            terms += [{k: v for k, v in reduced.items() if v != 0}]
+
+        distinct = [
+            len(set(k[i] for t in terms for k in t.keys()))
+            for i in range(self.num_variables)
+        ]
+        order = sorted(range(self.num_variables), key=lambda i: distinct[i])
+        self.outputs = [self._horner(t, order, 0) for t in terms]
+        del self.memo
+
+        # free intermediate columns after their last use to bound memory
+        last_use = dict()
+        for i, (op, dst, a, b, c) in enumerate(self.program):
+            for o in [a, b, c]:
+                if o[0] == "r":
+                    last_use[o[1]] = i
+        for o in self.outputs:
+            if o[0] == "r":
+                last_use[o[1]] = len(self.program)
+        self.release = [[] for i in range(len(self.program))]
+        for register, i in last_use.items():
+            if register >= self.num_variables and i < len(self.program):
+                self.release[i] += [register]
+
+    def _emit(self, op, a, b, c=("c", 0)):
+        p = self.field.p
+        # fold constants
+        if a[0] == "c" and b[0] == "c" and c[0] == "c":
+            return ("c", (a[1] * b[1] + c[1]) % p)
+        if a == ("c", 0) or b == ("c", 0):
+            return c
+        if b == ("c", 1) and c == ("c", 0):
+            return a
+        if a == ("c", 1) and c == ("c", 0):
+            return b
+        key = (op,) + tuple(sorted([a, b])) + (c,)
+        if key not in self.memo:
+            self.program += [(op, self.num_registers, a, b, c)]
+            self.memo[key] = ("r", self.num_registers)
+            self.num_registers += 1
+        return self.memo[key]
+
+    def _power(self, variable, exponent):
+        # square-and-multiply over a shared, memoized power table
+        if exponent == 1:
+            return ("r", variable)
+        if (variable, exponent) not in self.powers:
+            if exponent % 2 == 0:
+                half = self._power(variable, exponent // 2)
+                power = self._emit("fma", half, half)
+            else:
+                power = self._emit(
+                    "fma", self._power(variable, exponent - 1), ("r", variable)
+                )
+            self.powers[(variable, exponent)] = power
+        return self.powers[(variable, exponent)]
+
+    def _horner(self, terms, order, depth):
+        if len(terms) == 0:
+            return ("c", 0)
+        if depth == len(order):
+            return ("c", sum(terms.values()) % self.field.p)
+
+        # group by the exponent of the current variable
+        variable = order[depth]
+        groups = dict()
+        for k, v in terms.items():
+            groups.setdefault(k[variable], dict())[k] = v
+        exponents = sorted(groups.keys(), reverse=True)
+
+        acc = self._horner(groups[exponents[0]], order, depth + 1)
+        for previous, exponent in zip(exponents, exponents[1:]):
+            inner = self._horner(groups[exponent], order, depth + 1)
+            acc = self._emit(
+                "fma", acc, self._power(variable, previous - exponent), inner
+            )
+        if exponents[-1] > 0:
+            acc = self._emit("fma", acc, self._power(variable, exponents[-1]))
+        return acc
+
+    def evaluate_columns(self, columns):
+        """
+        Evaluates every polynomial on every row, columns holds one list of
+        integers per variable and all columns have the same length.
+        Returns one list of integers per polynomial.
+        """
+        assert len(columns) >= self.num_variables, "not enough variable columns"
+        p = self.field.p
+        length = len(columns[0]) if len(columns) > 0 else 1
+        registers = [c for c in columns[: self.num_variables]] + [None] * (
+            self.num_registers - self.num_variables
+        )
+
+        def operand(o):
+            return registers[o[1]] if o[0] == "r" else repeat(o[1], length)
+
+        for i, (op, dst, a, b, c) in enumerate(self.program):
+            if c == ("c", 0):
+                registers[dst] = [x * y % p for x, y in zip(operand(a), operand(b))]
+            else:
+                registers[dst] = [
+                    (x * y + z) % p
+                    for x, y, z in zip(operand(a), operand(b), operand(c))
+                ]
+            for register in self.release[i]:
+                registers[register] = None
+        return [
+            [v for v in registers[o[1]]] if o[0] == "r" else [o[1]] * length
+            for o in self.outputs
+        ]
+
+    def evaluate(self, point):
+        values = self.evaluate_columns([[x.value] for x in point])
+        return [FieldElement(v[0], self.field) for v in values]
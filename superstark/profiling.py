@@ -0,0 +1,134 @@
+"""
+Profiling: Opt-in phase timings and operation counters.
+
+Instrumented code marks its phases with `with phase("fri.fold"):`, when no
+profiler is active phase returns a shared no-op context manager so the cost
+is one global lookup per phase.
+Operation counters are installed by wrapping FieldElement, FiniteField and
+Merkle methods when a profiler is entered and removed when it exits, so
+nothing is counted, nor slowed down, outside of a profiler.
+
+    with Profiler() as profiler:
+        stark.prove(trace, transition_constraints, boundary)
+    print(profiler.report())
+
+Operations performed on raw integers in the vectorized paths (NTTs, folds,
+pointwise quotients) are not field element operations and are covered by
+the phase timings only.
+"""
+
+import time
+from functools import wraps
+from superstark.ff import FieldElement, FiniteField
+from superstark.merkle import Merkle
+from superstark.fs import ProofStream
+
+ACTIVE = None
+
+
+class NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+NULL_PHASE = NullPhase()
+
+
+def phase(name):
+    if ACTIVE is None:
+        return NULL_PHASE
+    return Phase(ACTIVE, name)
+
+
+class Phase:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name) -> None:
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+# (owner, attribute, counter) triples wrapped while a profiler is active,
+# __pow__ is left out since it calls __xor__ and would count twice
+COUNTED = [
+    (FieldElement, "__mul__", "mul"),
+    (FieldElement, "__rmul__", "mul"),
+    (FiniteField, "mul", "mul"),
+    (FieldElement, "inv", "inv"),
+    (FieldElement, "__truediv__", "inv"),
+    (FieldElement, "__rtruediv__", "inv"),
+    (FieldElement, "__xor__", "exp"),
+    (FiniteField, "batch_inverse", "batch_inverse"),
+    (Merkle, "H", "hash"),
+    (ProofStream, "prover", "transcript"),
+    (ProofStream, "verifier", "transcript"),
+]
+
+
+def counting(counters, name, fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        counters[name] += 1
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+class Profiler:
+    """
+    Collects the wall time and number of entries of every phase, phases
+    nest and each records its inclusive time, and the counts of field
+    multiplications, inversions, exponentiations, hash and transcript calls.
+    Only one profiler may be active at a time.
+    """
+
+    def __init__(self) -> None:
+        self.phases = dict()
+        self.counters = {name: 0 for owner, attribute, name in COUNTED}
+        self.originals = []
+
+    def record(self, name, seconds):
+        entry = self.phases.get(name)
+        if entry is None:
+            self.phases[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def __enter__(self):
+        global ACTIVE
+        assert ACTIVE is None, "a profiler is already active"
+        for owner, attribute, name in COUNTED:
+            original = owner.__dict__[attribute]
+            self.originals += [(owner, attribute, original)]
+            setattr(owner, attribute, counting(self.counters, name, original))
+        ACTIVE = self
+        return self
+
+    def __exit__(self, *args):
+        global ACTIVE
+        for owner, attribute, original in reversed(self.originals):
+            setattr(owner, attribute, original)
+        self.originals = []
+        ACTIVE = None
+        return False
+
+    def report(self):
+        return {
+            "phases": {
+                name: {"seconds": seconds, "count": count}
+                for name, (seconds, count) in self.phases.items()
+            },
+            "counters": dict(self.counters),
+        }
@@ -0,0 +1,96 @@
+"""
+Quotient: Pointwise computation of quotient codewords over coset domains.
+
+A quotient q(x) = n(x) / z(x) is never materialized in coefficient form,
+numerators are evaluated on the coset {offset * generator^i}, zerofiers are
+evaluated in closed form on the same coset and inverted in batch, and the
+quotient codeword is their pointwise product.
+All routines work on codewords of raw integers modulo p.
+"""
+
+from superstark.fastmath import batch_inverse
+from superstark.ntt import _ntt, fast_zerofier
+from superstark.domain import get_domain
+
+
+def coset_powers(offset, generator, length, exponent=1):
+    # [(offset * generator^i)^exponent for i in range(length)] by successive
+    # multiplication, plain domains are served from the shared domain cache
+    # and must not be modified
+    if exponent == 1:
+        return get_domain(offset, generator, length).values
+    p = offset.field.p
+    step = pow(generator.value, exponent, p)
+    acc = pow(offset.value, exponent, p)
+    powers = [0] * length
+    for i in range(length):
+        powers[i] = acc
+        acc = acc * step % p
+    return powers
+
+
+def vanishing_inverse_codeword(offset, generator, length, order):
+    """
+    Returns the codeword of 1 / (x^order - 1) on the coset, where x^order - 1
+    vanishes on the subgroup of the given order.
+    Since generator has order length, x^order only takes length / order
+    distinct values on the coset and only those are inverted.
+    """
+    p = offset.field.p
+    period = length // order
+    values = [(x - 1) % p for x in coset_powers(offset, generator, period, order)]
+    inverses = batch_inverse(values, p)
+    return [inverses[i % period] for i in range(length)]
+
+
+def points_product_codeword(offset, generator, length, points):
+    # codeword of prod (x - point) on the coset
+    p = offset.field.p
+    domain = coset_powers(offset, generator, length)
+    codeword = [1] * length
+    for point in points:
+        codeword = [c * (x - point.value) % p for c, x in zip(codeword, domain)]
+    return codeword
+
+
+def points_product_codeword_ntt(offset, generator, length, points):
+    # same as points_product_codeword for many points, the product polynomial
+    # is built with fast_zerofier and extended onto the coset with one transform
+    p = offset.field.p
+    zerofier = fast_zerofier(points, generator, length)
+    coefficients = [c.value for c in zerofier.coefficients]
+    power = 1
+    for i in range(len(coefficients)):
+        coefficients[i] = coefficients[i] * power % p
+        power = power * offset.value % p
+    coefficients += [0] * (length - len(coefficients))
+    return _ntt(coefficients, generator.value, p)
+
+
+def subgroup_zerofier_inverse_codeword(
+    offset, generator, length, subgroup_order, excluded=()
+):
+    """
+    Returns the codeword of 1 / Z(x) on the coset, where Z vanishes on the
+    subgroup of the given order except at the excluded points, that is
+    Z(x) = (x^subgroup_order - 1) / prod (x - e) for e in excluded.
+    """
+    p = offset.field.p
+    inverse = vanishing_inverse_codeword(offset, generator, length, subgroup_order)
+    if len(excluded) == 0:
+        return inverse
+    if len(excluded) < len(bin(length)) - 2:
+        product = points_product_codeword(offset, generator, length, excluded)
+    else:
+        product = points_product_codeword_ntt(offset, generator, length, excluded)
+    return [i * e % p for i, e in zip(inverse, product)]
+
+
+def points_zerofier_inverse_codeword(offset, generator, length, points):
+    # codeword of 1 / prod (x - point) on the coset, for few points
+    p = offset.field.p
+    return batch_inverse(points_product_codeword(offset, generator, length, points), p)
+
+
+def quotient_codeword(numerator, zerofier_inverse, p):
+    return [n * z % p for n, z in zip(numerator, zerofier_inverse)]
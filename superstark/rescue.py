@@ -3,7 +3,9 @@ Rescue: Implementation of the Rescue Prime Hash Function.
 Reference: https://eprint.iacr.org/2020/1143.pdf
 """
 
-from ff import FieldElement, FiniteField
+from superstark.ff import FieldElement, FiniteField
+from superstark.poly import Univariate
+from superstark.packed import PackedMultivariate
 
 
 class RescuePrime:
@@ -156,42 +158,168 @@ class RescuePrime:
             ]
         ]
 
+    def round_(self, state, r):
+        # one round of the permutation, returns the new state
+
+        # forward half-round
+        # S-box
+        state = [s ^ self.alpha for s in state]
+        # matrix
+        temp = [self.field.dot(self.MDS[i], state) for i in range(self.m)]
+        # constants
+        state = [
+            temp[i] + self.round_constants[2 * r * self.m + i] for i in range(self.m)
+        ]
+
+        # backward half-round
+        # S-box
+        state = [s ^ self.alphainv for s in state]
+        # matrix
+        temp = [self.field.dot(self.MDS[i], state) for i in range(self.m)]
+        # constants
+        return [
+            temp[i] + self.round_constants[2 * r * self.m + self.m + i]
+            for i in range(self.m)
+        ]
+
     def hash(self, input_element):
         # absorb
         state = [input_element] + [self.field.zero()] * (self.m - 1)
 
         # permutation
         for r in range(self.N):
+            state = self.round_(state, r)
+
+        # squeeze
+        return state[0]
+
+    # The AIR for Rescue-Prime uses one register per state element and one row
+    # per round; row 0 is the absorbed input and row N the final state.
+    def trace(self, input_element):
+        # absorb
+        state = [input_element] + [self.field.zero()] * (self.m - 1)
+        trace = [state]
+
+        # permutation
+        for r in range(self.N):
+            state = self.round_(state, r)
+            trace += [state]
+
+        return trace
+
+    def bulk_trace(self, input_elements):
+        """
+        Computes the execution traces of many hash invocations at once and
+        returns them in columnar form: one list of m register columns of
+        N+1 elements per input.
+        The permutation runs on raw integers across all invocations in lock
+        step so no intermediate field elements are allocated.
+        """
+        p = self.p
+        m = self.m
+        count = len(input_elements)
+        mds = [[c.value for c in row] for row in self.MDS]
+        constants = [c.value for c in self.round_constants]
+
+        # registers[i][k] is register i of invocation k
+        registers = [[x.value % p for x in input_elements]] + [
+            [0] * count for i in range(m - 1)
+        ]
+        history = [[registers[i]] for i in range(m)]
 
+        for r in range(self.N):
             # forward half-round
-            # S-box
-            for i in range(self.m):
-                state[i] = state[i] ^ self.alpha
-            # matrix
-            temp = [self.field.zero() for i in range(self.m)]
-            for i in range(self.m):
-                for j in range(self.m):
-                    temp[i] = temp[i] + self.MDS[i][j] * state[j]
-            # constants
-            state = [
-                temp[i] + self.round_constants[2 * r * self.m + i]
-                for i in range(self.m)
+            sbox = [[pow(v, self.alpha, p) for v in reg] for reg in registers]
+            registers = [
+                [
+                    (
+                        sum(a * b for a, b in zip(mds[i], values))
+                        + constants[2 * r * m + i]
+                    )
+                    % p
+                    for values in zip(*sbox)
+                ]
+                for i in range(m)
             ]
-
             # backward half-round
-            # S-box
-            for i in range(self.m):
-                state[i] = state[i] ^ self.alphainv
-            # matrix
-            temp = [self.field.zero() for i in range(self.m)]
-            for i in range(self.m):
-                for j in range(self.m):
-                    temp[i] = temp[i] + self.MDS[i][j] * state[j]
-            # constants
-            state = [
-                temp[i] + self.round_constants[2 * r * self.m + self.m + i]
-                for i in range(self.m)
+            sbox = [[pow(v, self.alphainv, p) for v in reg] for reg in registers]
+            registers = [
+                [
+                    (
+                        sum(a * b for a, b in zip(mds[i], values))
+                        + constants[2 * r * m + m + i]
+                    )
+                    % p
+                    for values in zip(*sbox)
+                ]
+                for i in range(m)
             ]
+            for i in range(m):
+                history[i] += [registers[i]]
 
-        # squeeze
-        return state[0]
+        return [
+            [
+                [FieldElement(history[i][r][k], self.field) for r in range(self.N + 1)]
+                for i in range(m)
+            ]
+            for k in range(count)
+        ]
+
+    def boundary_constraints(self, output_element):
+        # constraints are (cycle, register, value) triples
+        constraints = []
+        # at start, capacity is zero
+        constraints += [(0, 1, self.field.zero())]
+        # at end, rate part is the given output element
+        constraints += [(self.N, 0, output_element)]
+        return constraints
+
+    def round_constants_univariates(self, omicron):
+        # interpolate the constants of each half-round as functions of the
+        # cycle index omicron^r
+        domain = [omicron ^ r for r in range(self.N)]
+        first_step_constants = []
+        for i in range(self.m):
+            values = [self.round_constants[2 * r * self.m + i] for r in range(self.N)]
+            first_step_constants += [Univariate.interpolate_domain(domain, values)]
+        second_step_constants = []
+        for i in range(self.m):
+            values = [
+                self.round_constants[2 * r * self.m + self.m + i] for r in range(self.N)
+            ]
+            second_step_constants += [Univariate.interpolate_domain(domain, values)]
+        return first_step_constants, second_step_constants
+
+    def transition_constraints(self, omicron):
+        """
+        Arithmetizes one round of Rescue-Prime over the variables
+        (x, previous_state, next_state) where x = omicron^r is the cycle index.
+        The backward half-round is inverted so every constraint has degree alpha.
+        The constraints are built over packed exponents and converted once.
+        """
+        num_variables = 1 + 2 * self.m
+        first_step_constants, second_step_constants = [
+            [PackedMultivariate.lift(c, 0, num_variables) for c in constants]
+            for constants in self.round_constants_univariates(omicron)
+        ]
+
+        variables = PackedMultivariate.variables(num_variables, self.field)
+        previous_state = variables[1 : (1 + self.m)]
+        next_state = variables[(1 + self.m) : (1 + 2 * self.m)]
+        air = []
+        for i in range(self.m):
+            # left hand side is the forward half-round
+            lhs = first_step_constants[i]
+            for k in range(self.m):
+                lhs = lhs + (previous_state[k] ^ self.alpha) * self.MDS[i][k]
+
+            # right hand side is the inverted backward half-round
+            rhs = PackedMultivariate.constant(0, num_variables, self.field)
+            for k in range(self.m):
+                rhs = (
+                    rhs + (next_state[k] - second_step_constants[k]) * self.MDSinv[i][k]
+                )
+            rhs = rhs ^ self.alpha
+
+            air += [(lhs - rhs).to_multivariate()]
+        return air
@@ -0,0 +1,429 @@
+"""
+Service: Asyncio proving and verification server over a Unix socket.
+
+Frames are a 4 byte big endian length followed by a body made of a one byte
+code, an 8 byte request id and a sequence of fields, each a 4 byte length
+followed by raw bytes. Integer lists are encoded as a 4 byte count followed
+by every integer as a 2 byte length and its big endian bytes. The event
+loop never unpickles socket bytes, but serialized proofs are pickles, like
+the proof format itself, and are deserialized by the workers verifying
+them. The socket is therefore made accessible to its owner only and must
+only be reachable by trusted local clients.
+Requests are
+    PROVE  id [params, codeword integers]
+    VERIFY id [params, serialized proof]
+    CANCEL id [target id as integers]
+where params are the integers (p, domain_length, expansion_factor,
+num_colinearity_tests, remainder_length or 0) describing a FRI instance over
+the coset of the field's generator. Responses are
+    OK        id [serialized proof, opened indices]  for a proof
+    OK        id [accepted, i0, y0, i1, y1, ...]      for a verification
+    ERROR     id [utf-8 message]
+    CANCELLED id []
+
+Jobs run on a process pool with one worker per CPU by default. At most
+max_pending jobs are in flight, a job holds its slot until its pool work is
+done even if it was cancelled meanwhile. Once the limit is reached the server
+stops reading from a connection after its next prove or verify request, so
+clients are slowed down by the socket buffers, cancel requests never wait
+for a slot.
+Verify requests sharing params are collected for batch_delay seconds, or up
+to batch_size of them, and verified by a single pool task.
+Cancelling a job drops it if it has not reached a worker, a job already
+running completes but its result is discarded, closing a connection cancels
+its jobs.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from superstark.ff import FieldElement, FiniteField
+from superstark.fri import FRI
+from superstark.fs import ProofStream
+
+MAX_FRAME = 1 << 30
+
+PROVE = 1
+VERIFY = 2
+CANCEL = 3
+OK = 0
+ERROR = 1
+CANCELLED = 2
+
+
+def encode_ints(values):
+    out = [len(values).to_bytes(4, "big")]
+    for v in values:
+        encoded = v.to_bytes((v.bit_length() + 7) // 8, "big")
+        out += [len(encoded).to_bytes(2, "big"), encoded]
+    return b"".join(out)
+
+
+def decode_ints(data):
+    count = int.from_bytes(data[:4], "big")
+    values = []
+    position = 4
+    for i in range(count):
+        length = int.from_bytes(data[position : position + 2], "big")
+        position += 2
+        if position + length > len(data):
+            raise ValueError("truncated integer list")
+        values += [int.from_bytes(data[position : position + length], "big")]
+        position += length
+    if position != len(data):
+        raise ValueError("trailing bytes after integer list")
+    return values
+
+
+def encode_frame(code, id, fields):
+    body = [bytes([code]), id.to_bytes(8, "big")]
+    for field in fields:
+        body += [len(field).to_bytes(4, "big"), field]
+    body = b"".join(body)
+    return len(body).to_bytes(4, "big") + body
+
+
+def decode_header(body):
+    if len(body) < 9:
+        raise ValueError("frame too short")
+    return body[0], int.from_bytes(body[1:9], "big")
+
+
+def decode_fields(body):
+    fields = []
+    position = 9
+    while position < len(body):
+        length = int.from_bytes(body[position : position + 4], "big")
+        position += 4
+        if position + length > len(body):
+            raise ValueError("truncated field")
+        fields += [body[position : position + length]]
+        position += length
+    return fields
+
+
+async def read_frame(reader):
+    header = await reader.readexactly(4)
+    length = int.from_bytes(header, "big")
+    if length > MAX_FRAME:
+        raise ValueError("frame exceeds the maximum frame size")
+    return await reader.readexactly(length)
+
+
+def decode_params(field):
+    params = decode_ints(field)
+    if len(params) != 5:
+        raise ValueError("params must hold five integers")
+    p, domain_length, expansion_factor, num_colinearity_tests, remainder_length = params
+    return (
+        p,
+        domain_length,
+        expansion_factor,
+        num_colinearity_tests,
+        remainder_length if remainder_length != 0 else None,
+    )
+
+
+def encode_params(params):
+    return encode_ints([v if v is not None else 0 for v in params])
+
+
+def fri_from_params(params):
+    p, domain_length, expansion_factor, num_colinearity_tests, remainder_length = params
+    field = FiniteField(p)
+    return FRI(
+        field.generator(),
+        field.primitive_nth_root(domain_length),
+        domain_length,
+        expansion_factor,
+        num_colinearity_tests,
+        remainder_length,
+    )
+
+
+# jobs run in the worker processes, arguments and results are plain values
+def prove_job(params, codeword):
+    fri = fri_from_params(params)
+    proof_stream = ProofStream()
+    indices = fri.prove([FieldElement(v, fri.field) for v in codeword], proof_stream)
+    return proof_stream.serialize(), indices
+
+
+def verify_batch_job(params, proofs):
+    fri = fri_from_params(params)
+    results = []
+    for proof in proofs:
+        points = []
+        try:
+            accepted = fri.verify(ProofStream().deserialize(proof), points)
+        except Exception:
+            accepted = False
+        results += [(accepted, [(i, y.value) for i, y in points] if accepted else [])]
+    return results
+
+
+class ProofService:
+    def __init__(
+        self, path, workers=None, max_pending=None, batch_size=16, batch_delay=0.005
+    ) -> None:
+        self.path = path
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.max_pending = max_pending if max_pending is not None else 4 * self.workers
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.pool = None
+        self.server = None
+        self.slots = None
+        # params -> list of (proof, future, slot) waiting to be verified together
+        self.batches = dict()
+
+    async def start(self):
+        self.slots = asyncio.Semaphore(self.max_pending)
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.server = await asyncio.start_unix_server(self.handle, path=self.path)
+        os.chmod(self.path, 0o600)
+        return self
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+        # running jobs are abandoned rather than awaited on the event loop
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def handle(self, reader, writer):
+        jobs = dict()
+        try:
+            while True:
+                try:
+                    body = await read_frame(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except ValueError as e:
+                    # the stream cannot be resynchronized past a bad length
+                    writer.write(encode_frame(ERROR, 0, [str(e).encode()]))
+                    break
+                request = self.accept(body, jobs, writer)
+                if request is None:
+                    continue
+                # backpressure, stop reading until a job slot is free
+                await self.slots.acquire()
+                self.launch(*request, jobs, writer)
+        finally:
+            for job in list(jobs.values()):
+                job.cancel()
+            writer.close()
+
+    def accept(self, body, jobs, writer):
+        # decodes a request and returns (id, request) for the jobs to start,
+        # cancels are handled here and malformed requests are answered with
+        # an error frame
+        id = 0
+        try:
+            code, id = decode_header(body)
+            fields = decode_fields(body)
+            if code == CANCEL:
+                target = decode_ints(fields[0])[0]
+                job = jobs.get(target)
+                if job is not None:
+                    job.cancel()
+                return None
+            if code == PROVE:
+                return id, (code, decode_params(fields[0]), decode_ints(fields[1]))
+            if code == VERIFY:
+                return id, (code, decode_params(fields[0]), fields[1])
+            raise ValueError(f"unknown operation {code}")
+        except Exception as e:
+            writer.write(
+                encode_frame(ERROR, id, [f"malformed request: {e!r}".encode()])
+            )
+            return None
+
+    def launch(self, id, request, jobs, writer):
+        slot = Slot(self.slots)
+        job = asyncio.ensure_future(self.run(id, request, slot, writer))
+        jobs[id] = job
+        job.add_done_callback(lambda done, key=id: self.finish(jobs, key, done, slot))
+
+    def finish(self, jobs, key, job, slot):
+        slot.release()
+        if jobs.get(key) is job:
+            del jobs[key]
+
+    async def run(self, id, request, slot, writer):
+        try:
+            code, fields = OK, await self.dispatch(request, slot)
+        except asyncio.CancelledError:
+            if not writer.is_closing():
+                writer.write(encode_frame(CANCELLED, id, []))
+            raise
+        except Exception as e:
+            code, fields = ERROR, [repr(e).encode()]
+        if not writer.is_closing():
+            writer.write(encode_frame(code, id, fields))
+            await writer.drain()
+
+    async def dispatch(self, request, slot):
+        code, params, payload = request
+        loop = asyncio.get_running_loop()
+        if code == PROVE:
+            task = self.pool.submit(prove_job, params, payload)
+            slot.hold(task)
+            proof, indices = await asyncio.wrap_future(task)
+            return [proof, encode_ints(indices)]
+        future = loop.create_future()
+        batch = self.batches.setdefault(params, [])
+        batch += [(payload, future, slot)]
+        if len(batch) == 1:
+            loop.call_later(self.batch_delay, self.flush, params)
+        elif len(batch) >= self.batch_size:
+            self.flush(params)
+        accepted, points = await future
+        return [encode_ints([int(accepted)] + [v for point in points for v in point])]
+
+    def flush(self, params):
+        batch = [
+            (proof, future, slot)
+            for proof, future, slot in self.batches.pop(params, [])
+            if not future.cancelled()
+        ]
+        if batch == []:
+            return
+        task = self.pool.submit(
+            verify_batch_job, params, [proof for proof, future, slot in batch]
+        )
+        for proof, future, slot in batch:
+            slot.hold(task)
+
+        def deliver(task):
+            if task.cancelled() or task.exception() is not None:
+                for proof, future, slot in batch:
+                    if future.done():
+                        continue
+                    if task.cancelled():
+                        future.cancel()
+                    else:
+                        future.set_exception(task.exception())
+                return
+            for (proof, future, slot), result in zip(batch, task.result()):
+                if not future.done():
+                    future.set_result(result)
+
+        asyncio.wrap_future(task).add_done_callback(deliver)
+
+
+class Slot:
+    """
+    A job slot of the service, given back once the job's task and every pool
+    task submitted for it are done, a pool task keeps running after the job
+    is cancelled so it keeps the slot too.
+    """
+
+    def __init__(self, semaphore) -> None:
+        self.semaphore = semaphore
+        self.loop = asyncio.get_running_loop()
+        self.holders = 1
+
+    def hold(self, task):
+        self.holders += 1
+        task.add_done_callback(self.release_threadsafe)
+
+    def release_threadsafe(self, task):
+        # pool callbacks run on the executor's threads
+        try:
+            self.loop.call_soon_threadsafe(self.release)
+        except RuntimeError:
+            pass  # the loop is already closed
+
+    def release(self):
+        self.holders -= 1
+        if self.holders == 0:
+            self.semaphore.release()
+
+
+class ProofClient:
+    """
+    Connection to a ProofService, requests may be issued concurrently and
+    are matched to their responses by id.
+    """
+
+    def __init__(self, path) -> None:
+        self.path = path
+        self.next_id = 0
+        self.waiting = dict()
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_unix_connection(self.path)
+        self.receiver = asyncio.ensure_future(self.receive())
+        return self
+
+    async def close(self):
+        self.writer.close()
+        self.receiver.cancel()
+        for future, decode in self.waiting.values():
+            future.cancel()
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def receive(self):
+        try:
+            while True:
+                body = await read_frame(self.reader)
+                code, id = decode_header(body)
+                fields = decode_fields(body)
+                future, decode = self.waiting.pop(id, (None, None))
+                if future is None or future.done():
+                    continue
+                if code == OK:
+                    future.set_result(decode(fields))
+                elif code == CANCELLED:
+                    future.cancel()
+                else:
+                    future.set_exception(RuntimeError(fields[0].decode()))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            for future, decode in self.waiting.values():
+                future.cancel()
+
+    def submit(self, code, fields, decode):
+        # sends the request and returns (id, future of its decoded result)
+        self.next_id += 1
+        id = self.next_id
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[id] = (future, decode)
+        self.writer.write(encode_frame(code, id, fields))
+        return id, future
+
+    async def prove(self, params, codeword):
+        def decode(fields):
+            return fields[0], decode_ints(fields[1])
+
+        id, future = self.submit(
+            PROVE, [encode_params(params), encode_ints(codeword)], decode
+        )
+        await self.writer.drain()
+        return await future
+
+    async def verify(self, params, proof):
+        def decode(fields):
+            values = decode_ints(fields[0])
+            points = [(values[i], values[i + 1]) for i in range(1, len(values), 2)]
+            return values[0] == 1, points
+
+        id, future = self.submit(VERIFY, [encode_params(params), proof], decode)
+        await self.writer.drain()
+        return await future
+
+    async def cancel(self, id):
+        self.writer.write(encode_frame(CANCEL, 0, [encode_ints([id])]))
+        await self.writer.drain()
@@ -1,12 +1,474 @@
 """
 STARK:Implementation of STARK prover and verifier over AIR.
+
+The AIR is given as a list of transition constraints, multivariate polynomials
+over the variables (x, state, next_state) where x is the cycle index, and a list
+of boundary constraints as (cycle, register, value) triples.
+The execution trace is given in columnar form, one column per register.
+
+The trace is padded with random rows up to the trace subgroup generated by
+omicron so that it interpolates with a single inverse transform and is then
+extended onto the FRI domain, a coset of the subgroup generated by omega.
+Constraints and quotients are evaluated pointwise on that coset so no phase
+is worse than quasi-linear in the size of the FRI domain.
 """
 
+import os
+from superstark.constants import STARK_FIELD
 from superstark.ff import FiniteField, FieldElement
 from superstark.poly import Univariate, Multivariate
 from superstark.fri import FRI
+from superstark.fs import ProofStream, Sampler
+from superstark.merkle import Merkle, MerkleTree
+from superstark.domain import get_domain
+from superstark.lde import LDE
+from superstark.profiling import phase
+from superstark.ntt import fast_zerofier, fast_coset_evaluate
+from superstark.quotient import (
+    coset_powers,
+    quotient_codeword,
+    points_zerofier_inverse_codeword,
+    subgroup_zerofier_inverse_codeword,
+)
 
 
 class STARK:
-    def __init__(self) -> None:
-        pass
+    def __init__(
+        self,
+        expansion_factor,
+        num_colinearity_checks,
+        security_level,
+        num_registers,
+        num_cycles,
+        transition_constraints_degree=2,
+        field=None,
+        workers=1,
+    ) -> None:
+        self.field = FiniteField(STARK_FIELD) if field is None else field
+        assert (
+            len(bin(self.field.p)) - 2 >= security_level
+        ), "p must have at least as many bits as security level"
+        assert (
+            expansion_factor & (expansion_factor - 1) == 0
+        ), "expansion factor must be a power of 2"
+        assert expansion_factor >= 4, "expansion factor must be 4 or greater"
+        assert (
+            num_colinearity_checks * 2 >= security_level
+        ), "number of colinearity checks must be at least half of security level"
+
+        self.expansion_factor = expansion_factor
+        self.num_colinearity_checks = num_colinearity_checks
+        self.security_level = security_level
+        self.workers = workers
+
+        self.num_registers = num_registers
+        self.original_trace_length = num_cycles
+
+        # the randomized trace fills the trace subgroup exactly
+        randomized_trace_length = (
+            self.original_trace_length + 4 * num_colinearity_checks
+        )
+        self.trace_domain_length = 1
+        while self.trace_domain_length < randomized_trace_length:
+            self.trace_domain_length <<= 1
+        self.num_randomizers = self.trace_domain_length - self.original_trace_length
+
+        # the combination polynomial must have degree less than the
+        # composition domain length, FRI runs on its blowup
+        self.composition_domain_length = 1 << len(
+            bin(self.trace_domain_length * transition_constraints_degree)[2:]
+        )
+        fri_domain_length = self.composition_domain_length * expansion_factor
+
+        self.generator = self.field.generator()
+        self.omega = self.field.primitive_nth_root(fri_domain_length)
+        self.omicron = self.omega ^ (fri_domain_length // self.trace_domain_length)
+        self.omicron_domain = get_domain(
+            self.field.one(), self.omicron, self.trace_domain_length
+        ).points()
+
+        self.fri = FRI(
+            self.generator,
+            self.omega,
+            fri_domain_length,
+            self.expansion_factor,
+            self.num_colinearity_checks,
+        )
+
+    def transition_degree_bounds(self, transition_constraints):
+        point_degrees = [1] + [self.trace_domain_length - 1] * 2 * self.num_registers
+        return [
+            max(
+                sum(r * l for r, l in zip(point_degrees, k))
+                for k in a.dictionary.keys()
+            )
+            for a in transition_constraints
+        ]
+
+    def transition_quotient_degree_bounds(self, transition_constraints):
+        return [
+            d - (self.original_trace_length - 1)
+            for d in self.transition_degree_bounds(transition_constraints)
+        ]
+
+    def max_degree(self):
+        # degree bound enforced by FRI on the combination polynomial
+        return self.fri.domain_length // self.expansion_factor - 1
+
+    def transition_zerofier(self):
+        domain = self.omicron_domain[0 : (self.original_trace_length - 1)]
+        return fast_zerofier(domain, self.omicron, self.trace_domain_length)
+
+    # a register without boundary points has zerofier 1 and interpolant 0,
+    # its boundary quotient is the trace polynomial itself
+    def boundary_zerofiers(self, boundary):
+        zerofiers = []
+        for s in range(self.num_registers):
+            points = [self.omicron ^ c for c, r, v in boundary if r == s]
+            if len(points) == 0:
+                zerofiers = zerofiers + [Univariate([self.field.one()])]
+                continue
+            zerofiers = zerofiers + [Univariate.zerofier_domain(points)]
+        return zerofiers
+
+    def boundary_interpolants(self, boundary):
+        interpolants = []
+        for s in range(self.num_registers):
+            points = [(c, v) for c, r, v in boundary if r == s]
+            if len(points) == 0:
+                interpolants = interpolants + [Univariate([])]
+                continue
+            domain = [self.omicron ^ c for c, v in points]
+            values = [v for c, v in points]
+            interpolants = interpolants + [
+                Univariate.interpolate_domain(domain, values)
+            ]
+        return interpolants
+
+    def boundary_quotient_degree_bounds(self, boundary):
+        randomized_trace_degree = self.trace_domain_length - 1
+        return [
+            randomized_trace_degree - bz.degree()
+            for bz in self.boundary_zerofiers(boundary)
+        ]
+
+    # weights are base field elements, see the superstark.ff docstring for
+    # what this costs over small fields
+    def sample_weights(self, number, randomness):
+        return Sampler(randomness).field_elements(number, self.field)
+
+    def prove(
+        self,
+        trace,
+        transition_constraints,
+        boundary,
+        proof_stream=None,
+        low_memory=False,
+    ):
+        with phase("stark.prove"):
+            return self.prove_(
+                trace, transition_constraints, boundary, proof_stream, low_memory
+            )
+
+    def prove_(self, trace, transition_constraints, boundary, proof_stream, low_memory):
+        # create proof stream object if necessary
+        if proof_stream == None:
+            proof_stream = ProofStream()
+
+        assert (
+            len(trace) == self.num_registers
+        ), "trace must have one column per register"
+        assert all(
+            len(column) == self.original_trace_length for column in trace
+        ), "trace columns must have num_cycles rows"
+
+        p = self.field.p
+        fri_domain_length = self.fri.domain_length
+        max_degree = self.max_degree()
+
+        # pad every column with randomizers, interpolate over the trace
+        # subgroup and extend onto the FRI domain
+        randomized_trace = [
+            column
+            + [self.field.sample(os.urandom(17)) for i in range(self.num_randomizers)]
+            for column in trace
+        ]
+        with phase("stark.lde"):
+            trace_codewords = LDE(
+                self.generator,
+                self.omega,
+                fri_domain_length,
+                self.trace_domain_length,
+                self.workers,
+            ).extend(randomized_trace)
+
+        # subtract boundary interpolants and divide out boundary zerofiers
+        # pointwise on the FRI domain
+        boundary_interpolants = self.boundary_interpolants(boundary)
+        boundary_quotient_values = []
+        for s in range(self.num_registers):
+            points = [self.omicron ^ c for c, r, v in boundary if r == s]
+            zerofier_inverse = points_zerofier_inverse_codeword(
+                self.generator, self.omega, fri_domain_length, points
+            )
+            interpolant_codeword = fast_coset_evaluate(
+                boundary_interpolants[s], self.generator, self.omega, fri_domain_length
+            )
+            numerator = [
+                (t - i.value) % p
+                for t, i in zip(trace_codewords[s], interpolant_codeword)
+            ]
+            boundary_quotient_values += [
+                quotient_codeword(numerator, zerofier_inverse, p)
+            ]
+
+        # commit to boundary quotients
+        boundary_quotient_trees = []
+        for s in range(self.num_registers):
+            boundary_quotient_trees += [
+                MerkleTree(
+                    [FieldElement(v, self.field) for v in boundary_quotient_values[s]]
+                )
+            ]
+            proof_stream.push(boundary_quotient_trees[s].root())
+
+        # evaluate the transition constraints on the FRI domain, the next
+        # state of row i sits at index i + fri_domain_length / trace_domain_length
+        transition_quotient_degree_bounds = self.transition_quotient_degree_bounds(
+            transition_constraints
+        )
+        assert (
+            max(transition_quotient_degree_bounds) <= max_degree
+        ), "transition constraints degree exceeds the FRI degree bound"
+        next_shift = fri_domain_length // self.trace_domain_length
+        columns = (
+            [coset_powers(self.generator, self.omega, fri_domain_length)]
+            + trace_codewords
+            + [tc[next_shift:] + tc[:next_shift] for tc in trace_codewords]
+        )
+        with phase("stark.transition"):
+            transition_values = Multivariate.compile(
+                transition_constraints, self.field
+            ).evaluate_columns(columns)
+
+        # divide out the transition zerofier, which vanishes on the trace
+        # subgroup except for the rows that have no successor
+        excluded = self.omicron_domain[(self.original_trace_length - 1) :]
+        transition_zerofier_inverse = subgroup_zerofier_inverse_codeword(
+            self.generator,
+            self.omega,
+            fri_domain_length,
+            self.trace_domain_length,
+            excluded,
+        )
+        transition_quotient_values = [
+            quotient_codeword(tv, transition_zerofier_inverse, p)
+            for tv in transition_values
+        ]
+
+        # commit to randomizer polynomial
+        randomizer_polynomial = Univariate(
+            [self.field.sample(os.urandom(17)) for i in range(max_degree + 1)]
+        )
+        randomizer_codeword = fast_coset_evaluate(
+            randomizer_polynomial, self.generator, self.omega, fri_domain_length
+        )
+        randomizer_tree = MerkleTree(randomizer_codeword)
+        proof_stream.push(randomizer_tree.root())
+
+        # get weights for nonlinear combination
+        #  - 1 randomizer
+        #  - 2 for every transition quotient
+        #  - 2 for every boundary quotient
+        weights = self.sample_weights(
+            1 + 2 * len(transition_quotient_values) + 2 * self.num_registers,
+            proof_stream.prover(),
+        )
+
+        # compute the combination codeword pointwise, each term is shifted by
+        # x^shift so its degree bound matches the FRI bound
+        terms = [([v.value for v in randomizer_codeword], 0)]
+        for i in range(len(transition_quotient_values)):
+            terms += [
+                (
+                    transition_quotient_values[i],
+                    max_degree - transition_quotient_degree_bounds[i],
+                )
+            ]
+        boundary_quotient_degree_bounds = self.boundary_quotient_degree_bounds(boundary)
+        for i in range(self.num_registers):
+            terms += [
+                (
+                    boundary_quotient_values[i],
+                    max_degree - boundary_quotient_degree_bounds[i],
+                )
+            ]
+
+        combination = [0] * fri_domain_length
+        for i, (codeword, degree_shift) in enumerate(terms):
+            if i == 0:
+                w = weights[0].value
+                combination = [(c + w * v) % p for c, v in zip(combination, codeword)]
+                continue
+            w0 = weights[2 * i - 1].value
+            w1 = weights[2 * i].value
+            powers = coset_powers(
+                self.generator, self.omega, fri_domain_length, degree_shift
+            )
+            combination = [
+                (c + v * (w0 + w1 * x)) % p
+                for c, v, x in zip(combination, codeword, powers)
+            ]
+        combined_codeword = [FieldElement(c, self.field) for c in combination]
+
+        # prove low degree of combination polynomial
+        indices = self.fri.prove(combined_codeword, proof_stream, low_memory)
+        indices.sort()
+        next_shift = fri_domain_length // self.trace_domain_length
+        duplicated_indices = [i for i in indices] + [
+            (i + next_shift) % fri_domain_length for i in indices
+        ]
+
+        # open indicated positions in the boundary quotient codewords
+        for tree in boundary_quotient_trees:
+            for i in duplicated_indices:
+                proof_stream.push(tree.leaf(i))
+                path = tree.open(i)
+                proof_stream.push(path)
+
+        # ... as well as in the randomizer
+        for i in indices:
+            proof_stream.push(randomizer_tree.leaf(i))
+            path = randomizer_tree.open(i)
+            proof_stream.push(path)
+
+        # the final proof is just the serialized stream
+        return proof_stream.serialize()
+
+    def verify(self, proof, transition_constraints, boundary, proof_stream=None):
+        with phase("stark.verify"):
+            return self.verify_(proof, transition_constraints, boundary, proof_stream)
+
+    def verify_(self, proof, transition_constraints, boundary, proof_stream):
+        # deserialize with right proof stream
+        if proof_stream == None:
+            proof_stream = ProofStream()
+        proof_stream = proof_stream.deserialize(proof)
+
+        fri_domain_length = self.fri.domain_length
+        max_degree = self.max_degree()
+
+        # get Merkle roots of boundary quotient codewords
+        boundary_quotient_roots = []
+        for s in range(self.num_registers):
+            boundary_quotient_roots = boundary_quotient_roots + [proof_stream.pull()]
+
+        # get Merkle root of randomizer polynomial
+        randomizer_root = proof_stream.pull()
+
+        # get weights for nonlinear combination
+        weights = self.sample_weights(
+            1 + 2 * len(transition_constraints) + 2 * self.num_registers,
+            proof_stream.verifier(),
+        )
+
+        # verify low degree of combination polynomial
+        polynomial_values = []
+        verifier_accepts = self.fri.verify(proof_stream, polynomial_values)
+        polynomial_values.sort(key=lambda iv: iv[0])
+        if not verifier_accepts:
+            return False
+
+        indices = [i for i, v in polynomial_values]
+        values = [v for i, v in polynomial_values]
+
+        # read and verify leafs, which are elements of boundary quotient codewords
+        next_shift = fri_domain_length // self.trace_domain_length
+        duplicated_indices = [i for i in indices] + [
+            (i + next_shift) % fri_domain_length for i in indices
+        ]
+        leafs = []
+        for r in range(len(boundary_quotient_roots)):
+            leafs = leafs + [dict()]
+            for i in duplicated_indices:
+                leafs[r][i] = proof_stream.pull()
+                path = proof_stream.pull()
+                verifier_accepts = verifier_accepts and Merkle.verify(
+                    boundary_quotient_roots[r], i, path, leafs[r][i]
+                )
+                if not verifier_accepts:
+                    return False
+
+        # read and verify randomizer leafs
+        randomizer = dict()
+        for i in indices:
+            randomizer[i] = proof_stream.pull()
+            path = proof_stream.pull()
+            verifier_accepts = verifier_accepts and Merkle.verify(
+                randomizer_root, i, path, randomizer[i]
+            )
+            if not verifier_accepts:
+                return False
+
+        # precompute everything that does not depend on the index
+        boundary_zerofiers = self.boundary_zerofiers(boundary)
+        boundary_interpolants = self.boundary_interpolants(boundary)
+        transition_zerofier = self.transition_zerofier()
+        compiled_constraints = Multivariate.compile(transition_constraints, self.field)
+        transition_quotient_degree_bounds = self.transition_quotient_degree_bounds(
+            transition_constraints
+        )
+        boundary_quotient_degree_bounds = self.boundary_quotient_degree_bounds(boundary)
+
+        # verify leafs of combination polynomial
+        for i in range(len(indices)):
+            current_index = indices[i]
+
+            # get trace values by applying a correction to the boundary
+            # quotient values (which are the leafs)
+            domain_current_index = self.fri.eval_point(current_index)
+            next_index = (current_index + next_shift) % fri_domain_length
+            domain_next_index = self.fri.eval_point(next_index)
+            current_trace = [self.field.zero() for s in range(self.num_registers)]
+            next_trace = [self.field.zero() for s in range(self.num_registers)]
+            for s in range(self.num_registers):
+                zerofier = boundary_zerofiers[s]
+                interpolant = boundary_interpolants[s]
+
+                current_trace[s] = leafs[s][current_index] * zerofier.evaluate(
+                    domain_current_index
+                ) + interpolant.evaluate(domain_current_index)
+                next_trace[s] = leafs[s][next_index] * zerofier.evaluate(
+                    domain_next_index
+                ) + interpolant.evaluate(domain_next_index)
+
+            point = [domain_current_index] + current_trace + next_trace
+            transition_constraints_values = compiled_constraints.evaluate(point)
+
+            # compute nonlinear combination
+            terms = []
+            terms += [randomizer[current_index]]
+            transition_zerofier_value = transition_zerofier.evaluate(
+                domain_current_index
+            )
+            for s in range(len(transition_constraints_values)):
+                tcv = transition_constraints_values[s]
+                quotient = tcv / transition_zerofier_value
+                terms += [quotient]
+                shift = max_degree - transition_quotient_degree_bounds[s]
+                terms += [quotient * (domain_current_index ^ shift)]
+            for s in range(self.num_registers):
+                bqv = leafs[s][current_index]  # boundary quotient value
+                terms += [bqv]
+                shift = max_degree - boundary_quotient_degree_bounds[s]
+                terms += [bqv * (domain_current_index ^ shift)]
+            combination = self.field.zero()
+            for j in range(len(terms)):
+                combination = combination + terms[j] * weights[j]
+
+            # verify against combination polynomial value
+            verifier_accepts = verifier_accepts and (combination == values[i])
+            if not verifier_accepts:
+                return False
+
+        return verifier_accepts
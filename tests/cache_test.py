@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+from superstark import ff, fs, poly
+from superstark.cache import ProofCache
+from superstark.fri import FRI
+from superstark.merkle import Merkle
+from superstark.rescue import RescuePrime
+from superstark.stark import STARK
+
+STARK_PRIME = 1 + 407 * (1 << 119)
+
+
+class TestProofCache(unittest.TestCase):
+    def test_entries(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ProofCache(directory, max_bytes=300)
+            cache.put("a", b"x" * 100)
+            cache.put("b", b"y" * 100)
+            assert cache.get("a") == b"x" * 100 and cache.get("c") is None
+
+            # a corrupted entry is dropped on load
+            with open(cache.path("b"), "r+b") as f:
+                f.seek(40)
+                f.write(b"z")
+            assert cache.get("b") is None and not os.path.exists(cache.path("b"))
+
+            # least recently used entries are evicted past max_bytes
+            cache.put("c", b"c" * 100)
+            os.utime(cache.path("a"), ns=(0, 0))
+            cache.put("d", b"d" * 100)
+            assert cache.get("a") is None and cache.get("d") == b"d" * 100
+            assert cache.total <= cache.max_bytes
+
+    def test_fri_and_merkle(self):
+        field = ff.FiniteField(STARK_PRIME)
+        degree = 31
+        length = (degree + 1) * 4
+        fri = FRI(field.generator(), field.primitive_nth_root(length), length, 4, 8)
+        polynomial = poly.Univariate(
+            [ff.FieldElement(i, field) for i in range(degree + 1)]
+        )
+        codeword = polynomial.evaluate_domain(fri.eval_domain())
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ProofCache(directory)
+            tree = cache.merkle_tree(codeword)
+            cached = cache.merkle_tree(codeword)
+            assert cached.root() == tree.root() == Merkle.commit(codeword)
+            assert cached.open(3) == tree.open(3)
+
+            proofs = []
+            for i in range(2):
+                proof_stream = fs.ProofStream()
+                proof_stream.push(b"prefix")
+                indices = cache.fri_prove(fri, codeword, proof_stream)
+                proofs += [(proof_stream, indices)]
+            assert cache.hits == 2
+            assert proofs[0][0].objects == proofs[1][0].objects
+            assert proofs[0][1] == proofs[1][1]
+            proof_stream = proofs[1][0]
+            proof_stream.pull()
+            assert fri.verify(proof_stream, [])
+
+    def test_stark(self):
+        rp = RescuePrime()
+        output = rp.hash(ff.FieldElement(7, rp.field))
+        stark = STARK(4, 2, 2, rp.m, rp.N + 1, rp.alpha)
+        trace = rp.bulk_trace([ff.FieldElement(7, rp.field)])[0]
+        transition_constraints = rp.transition_constraints(stark.omicron)
+        boundary = rp.boundary_constraints(output)
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ProofCache(directory)
+            proof = cache.stark_prove(stark, trace, transition_constraints, boundary)
+            assert (
+                cache.stark_prove(stark, trace, transition_constraints, boundary)
+                == proof
+            )
+            assert cache.hits == 1
+            assert stark.verify(proof, transition_constraints, boundary)
@@ -0,0 +1,40 @@
+import unittest
+
+from superstark import ff
+from superstark.domain import DomainCache, get_domain
+
+STARK_PRIME = 1 + 407 * (1 << 119)
+
+
+class TestDomain(unittest.TestCase):
+    def test_domain_tables(self):
+        field = ff.FiniteField(STARK_PRIME)
+        size = 32
+        omega = field.primitive_nth_root(size)
+        offset = field.generator()
+        domain = get_domain(offset, omega, size)
+
+        points = [offset * (omega ^ i) for i in range(size)]
+        assert domain.points() == points
+        assert domain.inverses() == [x.inv().value for x in points]
+        assert domain.twiddles() == [(omega ^ i).value for i in range(size // 2)]
+        assert sorted(domain.bit_reversal()) == list(range(size))
+        assert domain.bit_reversal()[1] == size // 2
+        assert domain.squared().points() == [x ^ 2 for x in points[: size // 2]]
+
+        # domains are shared across lookups
+        assert get_domain(offset, omega, size) is domain
+
+    def test_cache_eviction(self):
+        field = ff.FiniteField(STARK_PRIME)
+        cache = DomainCache(max_points=48)
+        one = field.one()
+        first = cache.lookup(field.p, 1, field.primitive_nth_root(32).value, 32)
+        cache.lookup(field.p, 1, field.primitive_nth_root(16).value, 16)
+        assert cache.num_points == 48
+        cache.lookup(field.p, 1, field.primitive_nth_root(8).value, 8)
+        assert cache.num_points == 24
+        assert (
+            cache.lookup(field.p, one.value, field.primitive_nth_root(32).value, 32)
+            is not first
+        )
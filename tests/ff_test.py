@@ -19,3 +19,68 @@ class TestFiniteFields(unittest.TestCase):
         assert a - b == f.sub(a, b)
         assert a * b == f.mul(a, b)
         assert a * a.inv() == f.one()
+
+    def test_field_profiles(self):
+        for name in ["goldilocks", "babybear"]:
+            f = ff.FiniteField.from_profile(name)
+            n = 1 << f.profile.two_adicity
+            omega = f.primitive_nth_root(n)
+            assert omega ^ n == f.one()
+            assert omega ^ (n // 2) != f.one()
+            assert f.unpack(f.pack([f.generator(), -f.one()])) == [
+                f.generator(),
+                -f.one(),
+            ]
+
+    def test_extension_fields(self):
+        f = ff.FiniteField.from_profile("goldilocks")
+        for degree in [2, 3]:
+            e = f.extension(degree)
+            a = e.sample(bytes(range(32)))
+            b = e.sample(bytes(range(32, 64)))
+            assert a * a.inv() == e.one()
+            assert (a + b) * b == a * b + b * b
+            assert a * ff.FieldElement(3, f) == a + a + a
+            three = ff.FieldElement(3, f)
+            assert three * a == a * three and three + a == a + three
+            assert three - a == -(a - three)
+            assert (three / a) * a == three and 3 / a == three / a
+            assert a / three * three == a
+            assert len({a, three, e.lift(three), a + 0}) == 2
+            # x^k - W is irreducible so x^k reduces to W
+            x = ff.ExtensionFieldElement([0, 1] + [0] * (degree - 2), e)
+            assert x ^ degree == ff.FieldElement(e.non_residue, f)
+
+    def test_integer_fast_paths(self):
+        f = ff.FiniteField(_PRIME)
+        a = ff.FieldElement(5, f)
+        assert a + 3 == 3 + a == ff.FieldElement(8, f)
+        assert a - 7 == ff.FieldElement(_PRIME - 2, f)
+        assert 7 - a == ff.FieldElement(2, f)
+        assert 2 * a == a * 2 == 10
+        assert a**3 == (a ^ 3) == 125
+        assert (a ^ -1) == a.inv() == 1 / a
+        assert f.sum([a, a, a]) == 15
+        assert f.product([a, a, a]) == 125
+        assert len({ff.FieldElement(5, f), a}) == 1
+
+    def test_lazy_accumulation(self):
+        f = ff.FiniteField(_PRIME)
+        xs = [ff.FieldElement(_PRIME - i, f) for i in range(1, 9)]
+        ys = [ff.FieldElement(_PRIME - 3 * i, f) for i in range(1, 9)]
+        expected = f.zero()
+        for x, y in zip(xs, ys):
+            expected = expected + x * y
+        assert f.dot(xs, ys) == expected
+
+        acc = f.accumulator()
+        acc.add_dot(xs, ys)
+        acc.add_product(xs[0], ys[0])
+        acc.add(xs[1])
+        assert acc.value() == expected + xs[0] * ys[0] + xs[1]
+
+        point = ys[2]
+        expected = f.zero()
+        for i, c in enumerate(xs):
+            expected = expected + c * (point ^ i)
+        assert f.horner(xs, point) == expected
@@ -0,0 +1,46 @@
+import unittest
+
+from superstark import ff, fs, poly
+from superstark.fri_planner import MachineProfile, candidates, plan
+from superstark.ntt import fast_coset_evaluate
+
+STARK_PRIME = 1 + 407 * (1 << 119)
+
+
+class TestFRIPlanner(unittest.TestCase):
+    def test_plan(self):
+        field = ff.FiniteField(STARK_PRIME)
+        profile = MachineProfile(
+            mul_ns=100, inv_ns=2000, leaf_hash_ns=600, node_hash_ns=400
+        )
+        degree = 63
+        security_level = 32
+
+        plans = candidates(degree, security_level, field, profile)
+        assert all(p.security_bits >= security_level for p in plans)
+        fastest = plan(degree, security_level, field, profile, "prover")
+        smallest = plan(degree, security_level, field, profile, "size")
+        assert fastest.prover_ns == min(p.prover_ns for p in plans)
+        assert smallest.proof_bytes == min(p.proof_bytes for p in plans)
+        assert smallest.proof_bytes <= fastest.proof_bytes
+
+        # the planned FRI instance proves and verifies a polynomial of the
+        # degree bound with the predicted folding schedule
+        fri = smallest.fri()
+        assert fri.num_rounds() == smallest.num_rounds == len(smallest.schedule)
+        polynomial = poly.Univariate(
+            [ff.FieldElement(i, field) for i in range(degree + 1)]
+        )
+        codeword = fast_coset_evaluate(
+            polynomial, fri.offset, fri.omega, fri.domain_length
+        )
+        proof_stream = fs.ProofStream()
+        fri.prove(codeword, proof_stream)
+        assert fri.verify(proof_stream, [])
+        assert smallest.report()["schedule"][-1] == smallest.remainder_length
+
+    def test_measured_profile(self):
+        field = ff.FiniteField.from_profile("babybear")
+        profile = MachineProfile.measure(field, size=64, repeat=1)
+        assert profile.mul_ns > 0 and profile.node_hash_ns > 0
+        assert plan(255, 24, field, profile, "verifier").security_bits >= 24
@@ -58,7 +58,7 @@ class TestFRI(unittest.TestCase):
             print("rejecting proof, but proof should be valid!")
             return
 
-        for (x, y) in points:
+        for x, y in points:
             if polynomial.evaluate(omega ^ x) != y:
                 print("polynomial evaluates to wrong value")
                 assert False
@@ -76,3 +76,30 @@ class TestFRI(unittest.TestCase):
             proof_stream, points
         ), "proof should fail, but is accepted ..."
         print("success! \\o/")
+
+    def test_fri_low_memory(self):
+        field = ff.FiniteField(STARK_PRIME)
+        degree = 63
+        expansion_factor = 4
+        initial_codeword_length = (degree + 1) * expansion_factor
+        omega = field.primitive_nth_root(initial_codeword_length)
+        generator = field.generator()
+        fri = FRI(generator, omega, initial_codeword_length, expansion_factor, 8)
+
+        polynomial = poly.Univariate(
+            [ff.FieldElement(i, field) for i in range(degree + 1)]
+        )
+        codeword = polynomial.evaluate_domain(fri.eval_domain())
+
+        proof_stream = fs.ProofStream()
+        indices = fri.prove(codeword, proof_stream)
+        spilled_stream = fs.ProofStream()
+        spilled_indices = fri.prove(codeword, spilled_stream, low_memory=True)
+
+        # spilling the round codewords does not change the proof
+        assert spilled_indices == indices
+        assert spilled_stream.objects == proof_stream.objects
+        points = []
+        assert fri.verify(spilled_stream, points)
+        for i, y in points:
+            assert codeword[i] == y
@@ -0,0 +1,36 @@
+import unittest
+
+from superstark import ff
+from superstark.fs import ProofStream, Sampler
+
+STARK_PRIME = 1 + 407 * (1 << 119)
+
+
+class TestSampler(unittest.TestCase):
+    def test_sampler(self):
+        field = ff.FiniteField(STARK_PRIME)
+        proof_stream = ProofStream()
+        proof_stream.push(b"root")
+        seed = proof_stream.prover()
+
+        # prover and verifier derive the same challenges from the transcript
+        proof_stream.pull()
+        assert seed == proof_stream.verifier()
+        assert Sampler(seed).field_elements(8, field) == Sampler(seed).field_elements(
+            8, field
+        )
+
+        # one stream, reading in pieces or at once gives the same bytes
+        sampler = Sampler(seed)
+        assert sampler.read(100) + sampler.read(1000) == Sampler(seed).read(1100)
+
+        indices = Sampler(seed).indices(64, 1024, 128)
+        assert len(indices) == 64 and all(0 <= i < 1024 for i in indices)
+        assert len(set(i % 128 for i in indices)) == 64
+        # every residue is drawn when asking for all of them
+        assert sorted(Sampler(seed).indices(32, 32)) == list(range(32))
+
+        elements = Sampler(seed).field_elements(100, field)
+        assert all(0 <= e.value < field.p for e in elements)
+        assert len(set(e.value for e in elements)) == 100
+        assert field.sample(bytes([1, 2])) == ff.FieldElement(258, field)
@@ -0,0 +1,43 @@
+import unittest
+
+from superstark import ff, poly
+from superstark.lde import LDE
+from superstark.merkle import Merkle
+
+STARK_PRIME = 1 + 407 * (1 << 119)
+
+
+class TestLDE(unittest.TestCase):
+    def test_trace_extension(self):
+        field = ff.FiniteField(STARK_PRIME)
+        trace_length = 16
+        length = 8 * trace_length
+        offset = field.generator()
+        omega = field.primitive_nth_root(length)
+        omicron = omega ^ (length // trace_length)
+
+        columns = [
+            [field.sample(bytes([j, i])) for i in range(trace_length)] for j in range(3)
+        ]
+        lde = LDE(offset, omega, length, trace_length)
+        extended = lde.extend(columns)
+
+        # every extended column agrees with the interpolant of its trace column
+        trace_domain = [omicron ^ i for i in range(trace_length)]
+        for column, codeword in zip(columns, extended):
+            interpolant = poly.Univariate.interpolate_domain(trace_domain, column)
+            for i in range(0, length, 7):
+                assert interpolant.evaluate(offset * (omega ^ i)).value == codeword[i]
+
+        # workers produce the same extension
+        parallel = LDE(offset, omega, length, trace_length, workers=2)
+        assert parallel.extend(columns) == extended
+
+        # one leaf per row of the row-major matrix
+        matrix = lde.matrix(columns)
+        assert len(matrix) == length and matrix.width == 3
+        assert matrix.row(5) == [ff.FieldElement(c[5], field) for c in extended]
+        assert matrix.column(2) == extended[2]
+        tree = matrix.tree()
+        assert tree.root() == Merkle.commit(matrix.leafs())
+        assert Merkle.verify(tree.root(), 9, tree.open(9), matrix.leaf(9))
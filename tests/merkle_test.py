@@ -1,6 +1,9 @@
 import unittest
+import tempfile
 
-from superstark import merkle
+from superstark import ff, merkle
+
+STARK_PRIME = 1 + 407 * (1 << 119)
 
 
 class TestMerkleCommitments(unittest.TestCase):
@@ -11,3 +14,55 @@ class TestMerkleCommitments(unittest.TestCase):
         for index in range(len(objects)):
             ap = merkle.Merkle.open(index, objects)
             assert merkle.Merkle.verify(root, index, ap, objects[index]) is True
+
+    def test_merkle_tree(self):
+        field = ff.FiniteField(STARK_PRIME)
+        values = [i * i for i in range(32)]
+        leafs = [ff.FieldElement(v, field) for v in values]
+        root = merkle.Merkle.commit(leafs)
+
+        tree = merkle.MerkleTree(leafs)
+        with tempfile.TemporaryFile() as spill:
+            spilled = merkle.SpilledMerkleTree(values, field, spill)
+            assert tree.root() == root and spilled.root() == root
+            for index in range(len(leafs)):
+                path = merkle.Merkle.open_(
+                    index, [merkle.Merkle.H(bytes(leaf)).digest() for leaf in leafs]
+                )
+                assert tree.open(index) == path and spilled.open(index) == path
+                assert spilled.leaf(index) == leafs[index]
+                assert merkle.Merkle.verify(root, index, path, leafs[index])
+
+    def test_incremental_merkle(self):
+        field = ff.FiniteField(STARK_PRIME)
+        leafs = [ff.FieldElement(3 * i + 1, field) for i in range(21)]
+
+        def padded(leafs, capacity):
+            return leafs + [merkle.IncrementalMerkle.PAD] * (capacity - len(leafs))
+
+        tree = merkle.IncrementalMerkle(leafs[:3])
+        assert tree.capacity() == 4
+        assert tree.root() == merkle.Merkle.commit(padded(leafs[:3], 4))
+        tree.append(leafs[3:5])
+        tree.append(leafs[5:21])
+        assert len(tree) == 21 and tree.capacity() == 32
+        assert tree.root() == merkle.Merkle.commit(padded(leafs, 32))
+
+        leafs[2] = ff.FieldElement(7, field)
+        leafs[17] = ff.FieldElement(8, field)
+        tree.update_batch([(2, leafs[2]), (17, leafs[17])])
+        tree.update(20, leafs[20] + 1)
+        leafs[20] = leafs[20] + 1
+        root = merkle.Merkle.commit(padded(leafs, 32))
+        assert tree.root() == root
+        for index in range(len(leafs)):
+            assert merkle.Merkle.verify(root, index, tree.open(index), leafs[index])
+
+        # a failing batch leaves the tree untouched
+        with self.assertRaises(AssertionError):
+            tree.update_batch([(0, leafs[1]), (len(leafs), leafs[1])])
+        assert tree.root() == root and tree.leaf(0) == leafs[0]
+
+        single = merkle.IncrementalMerkle(leafs[:1])
+        assert single.capacity() == 2
+        assert merkle.Merkle.verify(single.root(), 0, single.open(0), leafs[0])
@@ -0,0 +1,38 @@
+import unittest
+import random
+
+from superstark import ff, ntt
+from superstark.poly import Univariate
+
+STARK_PRIME = 1 + 407 * (1 << 119)
+
+
+class TestNTT(unittest.TestCase):
+    def test_ntt(self):
+        field = ff.FiniteField(STARK_PRIME)
+        n = 64
+        omega = field.primitive_nth_root(n)
+        values = [ff.FieldElement(random.randrange(field.p), field) for i in range(n)]
+        polynomial = Univariate(values)
+        domain = [omega ^ i for i in range(n)]
+        assert ntt.ntt(omega, values) == polynomial.evaluate_domain(domain)
+        assert ntt.intt(omega, ntt.ntt(omega, values)) == values
+
+    def test_fast_arithmetic(self):
+        field = ff.FiniteField(STARK_PRIME)
+        n = 128
+        omega = field.primitive_nth_root(n)
+        offset = field.generator()
+        values = [ff.FieldElement(random.randrange(field.p), field) for i in range(60)]
+        lhs = Univariate(values[:40])
+        rhs = Univariate(values[40:])
+
+        assert ntt.fast_multiply(lhs, rhs, omega, n) == lhs * rhs
+
+        codeword = ntt.fast_coset_evaluate(lhs, offset, omega, n)
+        domain = [offset * (omega ^ i) for i in range(n)]
+        assert codeword == lhs.evaluate_domain(domain)
+        assert ntt.fast_coset_interpolate(codeword, offset, omega) == lhs
+
+        points = values[:12]
+        assert ntt.fast_zerofier(points, omega, n) == Univariate.zerofier_domain(points)
@@ -0,0 +1,90 @@
+import unittest
+import random
+
+from superstark import ff
+from superstark.packed import PackedMultivariate, PackedUnivariate, SparseUnivariate
+from superstark.poly import Multivariate, Univariate
+
+STARK_PRIME = 1 + 407 * (1 << 119)
+
+
+def random_polynomial(field, degree):
+    return Univariate(
+        [ff.FieldElement(random.randrange(field.p), field) for i in range(degree + 1)]
+    )
+
+
+class TestPackedUnivariate(unittest.TestCase):
+    def test_dense_arithmetic(self):
+        field = ff.FiniteField(STARK_PRIME)
+        for degrees in [(10, 7), (90, 70)]:
+            a = random_polynomial(field, degrees[0])
+            b = random_polynomial(field, degrees[1])
+            pa = PackedUnivariate.from_univariate(a)
+            pb = PackedUnivariate.from_univariate(b)
+
+            assert (pa + pb).to_univariate() == a + b
+            assert (pa - b).to_univariate() == a - b
+            assert (pa * pb).to_univariate() == a * b
+            assert (pb ^ 3).to_univariate() == b ^ 3
+            quo, rem = Univariate.divide(a, b)
+            pquo, prem = PackedUnivariate.divide(pa, pb)
+            assert pquo.to_univariate() == quo and prem.to_univariate() == rem
+            assert (pa * pb) / pb == pa
+
+            x = ff.FieldElement(random.randrange(field.p), field)
+            assert pa.evaluate(x) == a.evaluate(x)
+            assert pa.scale(x).to_univariate() == a.scale(x)
+
+        # trailing zeros are normalized away
+        padded = PackedUnivariate([1, 2, 0, 0], field)
+        assert padded.degree() == 1 and padded == Univariate(padded.coefficients)
+        assert (padded - padded).degree() == -1
+
+    def test_sparse(self):
+        field = ff.FiniteField(STARK_PRIME)
+        n = 16
+        c = ff.FieldElement(random.randrange(field.p), field)
+        binomial = SparseUnivariate.binomial(n, c, field)
+        dense = binomial.to_dense()
+        assert binomial.degree() == n and dense.degree() == n
+
+        q = PackedUnivariate.from_univariate(random_polynomial(field, 40))
+        product = binomial * q
+        assert product == dense * q
+        assert product / binomial == q
+        assert (product + PackedUnivariate([1], field)) % binomial == PackedUnivariate(
+            [1], field
+        )
+
+        x = ff.FieldElement(random.randrange(field.p), field)
+        assert binomial.evaluate(x) == (x ^ n) - c
+
+    def test_packed_multivariate(self):
+        field = ff.FiniteField(STARK_PRIME)
+        x, y, z = Multivariate.variables(3, field)
+        px, py, pz = PackedMultivariate.variables(3, field)
+        three = ff.FieldElement(3, field)
+
+        f = x * y + Multivariate.constant(three) * z - y
+        pf = px * py + pz * three - py
+        assert pf == PackedMultivariate.from_multivariate(f)
+        g = (f ^ 3) * (x - z)
+        pg = (pf ^ 3) * (px - pz)
+        assert pg.degree() == 7
+
+        point = [ff.FieldElement(random.randrange(field.p), field) for i in range(3)]
+        assert pg.evaluate(point) == g.evaluate(point)
+        assert pg.to_multivariate().evaluate(point) == g.evaluate(point)
+
+        # lifting places the coefficients on powers of the chosen variable
+        u = random_polynomial(field, 9)
+        lifted = PackedMultivariate.lift(u, 1, 3)
+        assert lifted.evaluate(point) == u.evaluate(point[1])
+        assert lifted == Multivariate.lift(u, 1)
+
+        # exponents past the bit-field are rejected instead of wrapping around
+        narrow = PackedMultivariate.variables(2, field, bits=4)[0]
+        narrow = narrow ^ 7
+        with self.assertRaises(AssertionError):
+            narrow * narrow
@@ -0,0 +1,67 @@
+import unittest
+import random
+
+from superstark import ff
+from superstark.poly import Univariate, Multivariate
+
+STARK_PRIME = 1 + 407 * (1 << 119)
+
+
+class TestMultivariate(unittest.TestCase):
+    def test_compiled_evaluation(self):
+        field = ff.FiniteField(STARK_PRIME)
+        x, y, z = Multivariate.variables(3, field)
+        c = Multivariate.constant(ff.FieldElement(7, field))
+        polynomials = [
+            (x ^ 5) * y + c * (y ^ 3) - z + c,
+            ((x + y) ^ 3) * (z ^ 2),
+            c,
+            Multivariate.zero(),
+        ]
+        compiled = Multivariate.compile(polynomials)
+
+        rows = 16
+        columns = [[random.randrange(field.p) for i in range(rows)] for v in range(3)]
+        values = compiled.evaluate_columns(columns)
+        for i in range(rows):
+            point = [ff.FieldElement(columns[v][i], field) for v in range(3)]
+            expected = [p.evaluate(point) for p in polynomials]
+            assert [values[j][i] for j in range(len(polynomials))] == [
+                e.value for e in expected
+            ]
+            assert compiled.evaluate(point) == expected
+
+    def test_evaluate_symbolic(self):
+        field = ff.FiniteField(STARK_PRIME)
+        x, y = Multivariate.variables(2, field)
+        c = Multivariate.constant(ff.FieldElement(3, field))
+        multivariate = (x ^ 4) * (y ^ 2) + c * x * y - (y ^ 5) + c
+
+        def random_polynomial(degree):
+            return Univariate(
+                [
+                    ff.FieldElement(random.randrange(field.p), field)
+                    for i in range(degree + 1)
+                ]
+            )
+
+        for degrees in [(9, 14), (1, 0)]:
+            point = [random_polynomial(d) for d in degrees]
+            composed = multivariate.evaluate_symbolic(point)
+            expected = (
+                (point[0] ^ 4) * (point[1] ^ 2)
+                + Univariate([ff.FieldElement(3, field)]) * point[0] * point[1]
+                - (point[1] ^ 5)
+                + Univariate([ff.FieldElement(3, field)])
+            )
+            assert composed == expected
+
+        # trailing zero coefficients, and a variable the polynomial never reads
+        sparse = (x ^ 5) + x
+        padded = Univariate(
+            [ff.FieldElement(3, field), ff.FieldElement(1, field)]
+            + [ff.FieldElement(0, field)] * 48
+        )
+        unused = random_polynomial(49)
+        for point in [[padded], [padded, unused], [random_polynomial(1), unused]]:
+            assert sparse.evaluate_symbolic(point) == (point[0] ^ 5) + point[0]
@@ -0,0 +1,47 @@
+import unittest
+
+from superstark import profiling
+from superstark.ff import FieldElement, FiniteField
+from superstark.poly import Multivariate
+from superstark.profiling import Profiler
+from superstark.stark import STARK
+
+
+class TestProfiler(unittest.TestCase):
+    def test_profiled_stark(self):
+        field = FiniteField.from_profile("goldilocks")
+        num_cycles = 8
+        a, b = [field.one()], [field.one()]
+        for i in range(num_cycles - 1):
+            a, b = a + [b[-1]], b + [a[-1] + b[-1]]
+        stark = STARK(4, 2, 2, 2, num_cycles, 1, field)
+        x, a0, b0, a1, b1 = Multivariate.variables(5, field)
+        transition_constraints = [a1 - b0, b1 - a0 - b0]
+        boundary_constraints = [(0, 0, field.one()), (num_cycles - 1, 1, b[-1])]
+
+        original = FieldElement.__mul__
+        with Profiler() as profiler:
+            proof = stark.prove([a, b], transition_constraints, boundary_constraints)
+            assert stark.verify(proof, transition_constraints, boundary_constraints)
+            assert profiling.ACTIVE is profiler
+        report = profiler.report()
+
+        for name in [
+            "stark.prove",
+            "stark.verify",
+            "fri.commit",
+            "fri.fold",
+            "fri.open",
+        ]:
+            assert report["phases"][name]["count"] >= 1
+        assert report["phases"]["fri.merkle"]["count"] == stark.fri.num_rounds()
+        assert report["counters"]["hash"] > 0 and report["counters"]["mul"] > 0
+
+        # a ** exponent goes through __xor__ and is counted once
+        with Profiler() as profiler:
+            field.one() ** 3
+        assert profiler.report()["counters"]["exp"] == 1
+
+        # counters are removed on exit and phases are no-ops again
+        assert profiling.ACTIVE is None and FieldElement.__mul__ is original
+        assert profiling.phase("fri.fold") is profiling.NULL_PHASE
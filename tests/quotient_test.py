@@ -0,0 +1,55 @@
+import unittest
+import random
+
+from superstark import ff, quotient
+from superstark.poly import Univariate
+
+STARK_PRIME = 1 + 407 * (1 << 119)
+
+
+class TestQuotient(unittest.TestCase):
+    def test_zerofier_codewords(self):
+        field = ff.FiniteField(STARK_PRIME)
+        length = 256
+        order = 16
+        omega = field.primitive_nth_root(length)
+        omicron = field.primitive_nth_root(order)
+        offset = field.generator()
+        domain = [offset * (omega ^ i) for i in range(length)]
+        subgroup = [omicron ^ i for i in range(order)]
+
+        # one excluded point uses the direct product, many use a transform
+        for kept in [15, 3]:
+            zerofier = Univariate.zerofier_domain(subgroup[:kept])
+            inverse = quotient.subgroup_zerofier_inverse_codeword(
+                offset, omega, length, order, subgroup[kept:]
+            )
+            assert [z.inv().value for z in zerofier.evaluate_domain(domain)] == inverse
+
+        points = [omicron ^ 0, omicron ^ 5]
+        zerofier = Univariate.zerofier_domain(points)
+        inverse = quotient.points_zerofier_inverse_codeword(
+            offset, omega, length, points
+        )
+        assert [z.inv().value for z in zerofier.evaluate_domain(domain)] == inverse
+
+    def test_quotient_codeword(self):
+        field = ff.FiniteField(STARK_PRIME)
+        length = 64
+        omega = field.primitive_nth_root(length)
+        offset = field.generator()
+        domain = [offset * (omega ^ i) for i in range(length)]
+        points = [ff.FieldElement(random.randrange(field.p), field) for i in range(3)]
+        q = Univariate(
+            [ff.FieldElement(random.randrange(field.p), field) for i in range(20)]
+        )
+        numerator = [
+            v.value
+            for v in (q * Univariate.zerofier_domain(points)).evaluate_domain(domain)
+        ]
+
+        inverse = quotient.points_zerofier_inverse_codeword(
+            offset, omega, length, points
+        )
+        codeword = quotient.quotient_codeword(numerator, inverse, field.p)
+        assert codeword == [v.value for v in q.evaluate_domain(domain)]
@@ -0,0 +1,42 @@
+import unittest
+
+from superstark.ff import FieldElement
+from superstark.rescue import RescuePrime
+
+
+class TestRescuePrime(unittest.TestCase):
+    def test_hash(self):
+        rp = RescuePrime()
+        assert rp.hash(FieldElement(1, rp.field)) == FieldElement(
+            244180265933090377212304188905974087294, rp.field
+        )
+
+    def test_trace(self):
+        rp = RescuePrime()
+        inputs = [FieldElement(v, rp.field) for v in [1, 2, 57]]
+        traces = rp.bulk_trace(inputs)
+        for x, columns in zip(inputs, traces):
+            rows = rp.trace(x)
+            assert len(rows) == rp.N + 1
+            assert rows[-1][0] == rp.hash(x)
+            for r in range(rp.N + 1):
+                for i in range(rp.m):
+                    assert columns[i][r] == rows[r][i]
+
+    def test_constraints(self):
+        rp = RescuePrime()
+        omicron = rp.field.primitive_nth_root(32)
+        x = FieldElement(57, rp.field)
+        rows = rp.trace(x)
+
+        air = rp.transition_constraints(omicron)
+        for r in range(rp.N):
+            point = [omicron ^ r] + rows[r] + rows[r + 1]
+            assert all(a.evaluate(point).is_zero() for a in air)
+
+        # a transition taken at the wrong cycle index must not satisfy the AIR
+        point = [omicron ^ 3] + rows[4] + rows[5]
+        assert not all(a.evaluate(point).is_zero() for a in air)
+
+        for cycle, register, value in rp.boundary_constraints(rp.hash(x)):
+            assert rows[cycle][register] == value
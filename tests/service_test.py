@@ -0,0 +1,125 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from superstark import ff
+from superstark.service import (
+    ERROR,
+    MAX_FRAME,
+    ProofClient,
+    ProofService,
+    read_frame,
+    verify_batch_job,
+)
+
+STARK_PRIME = 1 + 407 * (1 << 119)
+
+
+class TestProofService(unittest.TestCase):
+    def test_prove_and_verify(self):
+        field = ff.FiniteField(STARK_PRIME)
+        degree = 31
+        params = (STARK_PRIME, (degree + 1) * 4, 4, 8, None)
+        offset = field.generator().value
+        omega = field.primitive_nth_root(params[1]).value
+        # evaluations of 1 + x + ... + x^degree on the FRI domain
+        codeword = []
+        for i in range(params[1]):
+            x = offset * pow(omega, i, STARK_PRIME) % STARK_PRIME
+            codeword += [
+                sum(pow(x, k, STARK_PRIME) for k in range(degree + 1)) % STARK_PRIME
+            ]
+
+        async def session(path):
+            async with ProofService(path, workers=2, batch_delay=0.05) as service:
+                assert os.stat(path).st_mode & 0o777 == 0o600
+                async with ProofClient(path) as client:
+                    proof, indices = await client.prove(params, codeword)
+                    # concurrent verifications of the same parameters share a batch
+                    results = await asyncio.gather(
+                        client.verify(params, proof),
+                        client.verify(params, proof),
+                        client.verify(params, b"not a proof"),
+                    )
+                    # cancelling an unknown or finished job is harmless
+                    await client.cancel(12345)
+                    with self.assertRaises(RuntimeError):
+                        await client.prove(params[:2], codeword)
+                    return indices, results
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "superstark.sock")
+            indices, results = asyncio.run(session(path))
+            assert not os.path.exists(path)
+
+        (accepted, points), (again, same), (rejected, none) = results
+        assert accepted and again and not rejected
+        assert points == same and none == []
+        assert sorted(i for i, y in points) == sorted(indices)
+        for i, y in points:
+            assert codeword[i] == y
+
+    def test_malformed_frames(self):
+        params = (STARK_PRIME, 128, 4, 8, None)
+
+        async def session(path):
+            async with ProofService(path, workers=1, max_pending=2) as service:
+                # junk frames are answered with errors and give their slot back
+                for i in range(3):
+                    reader, writer = await asyncio.open_unix_connection(path)
+                    writer.write((5).to_bytes(4, "big") + b"junk!")
+                    await writer.drain()
+                    body = await read_frame(reader)
+                    assert body[0] == ERROR
+                    writer.close()
+                # an oversized frame closes the connection
+                reader, writer = await asyncio.open_unix_connection(path)
+                writer.write((MAX_FRAME + 1).to_bytes(4, "big"))
+                await writer.drain()
+                assert (await read_frame(reader))[0] == ERROR
+                assert await reader.read() == b""
+                writer.close()
+                assert service.slots._value == 2
+
+                async with ProofClient(path) as client:
+                    return await asyncio.wait_for(client.verify(params, b"\x80"), 10)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "superstark.sock")
+            assert asyncio.run(session(path)) == (False, [])
+
+    def test_cancel_and_backpressure(self):
+        length = 1 << 17
+        params = (STARK_PRIME, length, 4, 8, None)
+        codeword = list(range(1, length + 1))
+
+        async def session(path):
+            async with ProofService(path, workers=1, max_pending=1) as service:
+                async with ProofClient(path) as client:
+                    running = asyncio.ensure_future(client.prove(params, codeword))
+                    while not service.slots.locked():
+                        await asyncio.sleep(0.01)
+                    await asyncio.sleep(0.2)
+                    # the cancel is read although every slot is taken
+                    await client.cancel(1)
+                    with self.assertRaises(asyncio.CancelledError):
+                        await asyncio.wait_for(running, 10)
+                    # the worker is still busy so the slot is not given back
+                    # and the next request waits for it
+                    small = (STARK_PRIME, 128, 4, 8, None)
+                    waiting = asyncio.ensure_future(client.verify(small, b"x"))
+                    await asyncio.sleep(0.1)
+                    assert service.slots.locked() and not waiting.done()
+                    result = await asyncio.wait_for(waiting, 20)
+                    while service.slots.locked():
+                        await asyncio.sleep(0.01)
+                    return result
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "superstark.sock")
+            assert asyncio.run(session(path)) == (False, [])
+
+    def test_batch_job(self):
+        params = (STARK_PRIME, 128, 4, 8, None)
+        assert verify_batch_job(params, [b"", b"x"]) == [(False, []), (False, [])]
@@ -0,0 +1,56 @@
+import unittest
+
+from superstark.ff import FieldElement, FiniteField
+from superstark.poly import Multivariate
+from superstark.rescue import RescuePrime
+from superstark.stark import STARK
+
+
+class TestSTARK(unittest.TestCase):
+    def test_rescue_prime_stark(self):
+        rp = RescuePrime()
+        input_element = FieldElement(228894434762048332457318, rp.field)
+        output_element = rp.hash(input_element)
+        trace = rp.bulk_trace([input_element])[0]
+
+        stark = STARK(4, 2, 2, rp.m, rp.N + 1, rp.alpha)
+        transition_constraints = rp.transition_constraints(stark.omicron)
+        boundary_constraints = rp.boundary_constraints(output_element)
+
+        proof = stark.prove(trace, transition_constraints, boundary_constraints)
+        assert stark.verify(proof, transition_constraints, boundary_constraints)
+
+        # the same proof must not verify a different hash output
+        false_output = output_element + rp.field.one()
+        false_boundary = rp.boundary_constraints(false_output)
+        assert not stark.verify(proof, transition_constraints, false_boundary)
+
+    def test_small_field_stark(self):
+        field = FiniteField.from_profile("goldilocks")
+        num_cycles = 20
+        a, b = [field.one()], [field.one()]
+        for i in range(num_cycles - 1):
+            a, b = a + [b[-1]], b + [a[-1] + b[-1]]
+
+        stark = STARK(4, 2, 2, 2, num_cycles, 1, field)
+        x, a0, b0, a1, b1 = Multivariate.variables(5, field)
+        transition_constraints = [a1 - b0, b1 - a0 - b0]
+        boundary_constraints = [
+            (0, 0, field.one()),
+            (0, 1, field.one()),
+            (19, 1, b[-1]),
+        ]
+
+        proof = stark.prove([a, b], transition_constraints, boundary_constraints)
+        assert stark.verify(proof, transition_constraints, boundary_constraints)
+
+        # spilling the FRI rounds yields a proof that verifies just the same
+        proof = stark.prove(
+            [a, b], transition_constraints, boundary_constraints, low_memory=True
+        )
+        assert stark.verify(proof, transition_constraints, boundary_constraints)
+
+        # registers without boundary points are left unconstrained
+        boundary_constraints = [(0, 1, field.one()), (19, 1, b[-1])]
+        proof = stark.prove([a, b], transition_constraints, boundary_constraints)
+        assert stark.verify(proof, transition_constraints, boundary_constraints)